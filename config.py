@@ -0,0 +1,102 @@
+"""Typed configuration schema for config.yaml."""
+
+from typing import Annotated, List, Literal, Optional
+
+import msgspec
+
+# Required string settings must also be non-empty
+NonEmptyStr = Annotated[str, msgspec.Meta(min_length=1)]
+
+
+class FrigateConfig(msgspec.Struct):
+    """Frigate connection and polling settings."""
+    
+    base_url: NonEmptyStr
+    plus_api_key: NonEmptyStr
+    poll_interval_seconds: Annotated[int, msgspec.Meta(ge=1)] = 60
+    event_lookback_minutes: int = 10
+    daemon_mode: Literal["poll", "mqtt"] = "poll"
+
+
+class VisionModelConfig(msgspec.Struct):
+    """Vision model provider settings."""
+    
+    provider: NonEmptyStr
+    api_key: NonEmptyStr
+    model_name: str
+    endpoint_url: Optional[str] = None
+    timeout_seconds: int = 30
+    batch_requests: bool = False
+    # None = same as processing.review_concurrency
+    max_concurrency: Optional[Annotated[int, msgspec.Meta(ge=1)]] = None
+
+
+class ReviewRulesConfig(msgspec.Struct):
+    """Event filtering and decision rules."""
+    
+    # None = use the component default (0.0 for filtering, 0.5 for decisions)
+    min_confidence: Optional[float] = None
+    allowed_labels: Optional[List[str]] = None
+    reject_labels: Optional[List[str]] = None
+    exclude_cameras: Optional[List[str]] = None
+    include_cameras: Optional[List[str]] = None
+
+
+class ProcessingConfig(msgspec.Struct):
+    """Batch processing and submission settings."""
+    
+    max_events_per_run: int = 20
+    dry_run: bool = False
+    state_file: str = "state.json"
+    durable_state: bool = False
+    submission_method: Literal["snapshot", "event"] = "snapshot"
+    mark_as_reviewed: bool = True
+    snapshot_concurrency: Annotated[int, msgspec.Meta(ge=1)] = 8
+    review_concurrency: Annotated[int, msgspec.Meta(ge=1)] = 4
+    # None = always call the vision model
+    dedupe_distance: Optional[Annotated[int, msgspec.Meta(ge=0, le=64)]] = None
+
+
+class LoggingConfig(msgspec.Struct):
+    """Logging output settings."""
+    
+    level: str = "INFO"
+    file: Optional[str] = None
+    json_format: bool = False
+
+
+class MqttConfig(msgspec.Struct):
+    """MQTT broker settings for the event-driven daemon mode."""
+    
+    host: NonEmptyStr
+    port: int = 1883
+    username: Optional[str] = None
+    password: Optional[str] = None
+    topic_prefix: str = "frigate"
+
+
+class Config(msgspec.Struct):
+    """Complete application configuration."""
+    
+    frigate: FrigateConfig
+    vision_model: VisionModelConfig
+    review_rules: ReviewRulesConfig
+    processing: ProcessingConfig
+    logging: LoggingConfig = msgspec.field(default_factory=LoggingConfig)
+    mqtt: Optional[MqttConfig] = None
+
+
+def parse_config(raw: object) -> Config:
+    """
+    Validate raw (YAML-decoded) configuration and convert it to a Config.
+    
+    Args:
+        raw: Parsed YAML document
+    
+    Returns:
+        Config instance
+    
+    Raises:
+        msgspec.ValidationError: If a required setting is missing or invalid
+    """
+    return msgspec.convert(raw, type=Config)
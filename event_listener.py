@@ -0,0 +1,159 @@
+"""MQTT listener for Frigate event notifications."""
+
+import logging
+import queue
+import threading
+import time
+from typing import List, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+class FrigateEventListener:
+    """Subscribes to Frigate's MQTT event topic and queues finished events."""
+    
+    def __init__(
+        self,
+        host: str,
+        port: int = 1883,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        topic_prefix: str = "frigate"
+    ):
+        """
+        Initialize the event listener.
+        
+        Args:
+            host: MQTT broker hostname
+            port: MQTT broker port
+            username: Optional broker username
+            password: Optional broker password
+            topic_prefix: Frigate MQTT topic prefix (events arrive on <prefix>/events)
+        """
+        self.host = host
+        self.port = port
+        self.topic = f"{topic_prefix.rstrip('/')}/events"
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._connected = threading.Event()
+        self._resync = threading.Event()
+        
+        try:
+            import paho.mqtt.client as mqtt
+            self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        except ImportError:
+            logger.error("paho-mqtt package not installed")
+            raise
+        
+        if username:
+            self.client.username_pw_set(username, password)
+        
+        self.client.on_connect = self._on_connect
+        self.client.on_disconnect = self._on_disconnect
+        self.client.on_message = self._on_message
+    
+    def start(self) -> None:
+        """Connect to the broker and start the background network loop."""
+        logger.info("Connecting to MQTT broker %s:%s", self.host, self.port)
+        self.client.connect_async(self.host, self.port)
+        self.client.loop_start()
+    
+    def stop(self) -> None:
+        """Disconnect from the broker and stop the network loop."""
+        self.client.disconnect()
+        self.client.loop_stop()
+    
+    def is_connected(self) -> bool:
+        """Whether the listener is currently subscribed to the broker."""
+        return self._connected.is_set()
+    
+    def needs_resync(self) -> bool:
+        """
+        Check (and clear) whether events may have been missed.
+        
+        Set on every (re)connect, since events published while disconnected
+        are not delivered; callers should do one HTTP poll to catch up.
+        """
+        if self._resync.is_set():
+            self._resync.clear()
+            return True
+        return False
+    
+    def request_resync(self) -> None:
+        """Make the next needs_resync() call return True."""
+        self._resync.set()
+    
+    def wake(self) -> None:
+        """Make a blocked wait_for_events() call return early."""
+        self._queue.put(None)
+    
+    def wait_for_events(self, timeout: float, batch_window: float = 0.5) -> List[str]:
+        """
+        Wait for finished events and return their IDs.
+        
+        Blocks up to timeout for the first event, then collects whatever
+        else arrives within batch_window seconds so bursts are reviewed together.
+        
+        Args:
+            timeout: Maximum seconds to wait for the first event
+            batch_window: Seconds to keep collecting after the first event
+        
+        Returns:
+            List of event IDs (empty if none arrived)
+        """
+        try:
+            event_ids = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        
+        deadline = time.monotonic() + batch_window
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                event_ids.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        # Preserve arrival order, drop duplicates and wake() markers
+        return [event_id for event_id in dict.fromkeys(event_ids) if event_id]
+    
+    def _on_connect(self, client, userdata, flags, reason_code, properties) -> None:
+        """Subscribe to the events topic once connected."""
+        if reason_code.is_failure:
+            logger.error("MQTT connection failed: %s", reason_code)
+            return
+        
+        client.subscribe(self.topic)
+        self._connected.set()
+        self._resync.set()
+        logger.info("Subscribed to MQTT topic %s", self.topic)
+    
+    def _on_disconnect(self, client, userdata, flags, reason_code, properties) -> None:
+        """Track broker disconnects."""
+        self._connected.clear()
+        logger.warning("Disconnected from MQTT broker: %s", reason_code)
+    
+    def _on_message(self, client, userdata, msg) -> None:
+        """Queue the ID of every event Frigate reports as ended."""
+        try:
+            payload = orjson.loads(msg.payload)
+        except orjson.JSONDecodeError as e:
+            logger.error("Invalid JSON in MQTT event message: %s", e)
+            return
+        
+        if not isinstance(payload, dict):
+            logger.error("Unexpected MQTT event message: %.200s", msg.payload)
+            return
+        
+        if payload.get('type') != 'end':
+            return
+        
+        after = payload.get('after') or {}
+        if not isinstance(after, dict):
+            logger.error("Unexpected 'after' in MQTT event message: %.200s", msg.payload)
+            return
+        
+        event_id = after.get('id')
+        if event_id:
+            logger.debug("Received finished event %s via MQTT", event_id)
+            self._queue.put(event_id)
@@ -1,47 +1,138 @@
 """Frigate API Client for retrieving events and snapshots."""
 
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from io import BytesIO
 
+import orjson
 import requests
+import urllib3
 from PIL import Image
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import ijson
+except ImportError:  # Optional: streaming event parsing
+    ijson = None
 
 logger = logging.getLogger(__name__)
 
+# Predicate deciding whether an event should be reviewed
+EventFilter = Callable[[Dict], bool]
+
+# Read size used when streaming snapshot downloads
+SNAPSHOT_CHUNK_SIZE = 64 * 1024
+
+# How long a successful connection check (or event fetch) is trusted, in seconds
+CONNECTION_CHECK_TTL = 60
+
+# JPEG snapshots don't compress, so don't ask Frigate to gzip them
+SNAPSHOT_HEADERS = {'Accept-Encoding': 'identity'}
+
+
+def decode_snapshot(
+    data: bytes,
+    target_size: Optional[Tuple[int, int]] = None
+) -> Image.Image:
+    """
+    Decode snapshot bytes into a PIL Image.
+    
+    With a target size, JPEGs are decoded at a reduced scale (1/2, 1/4 or 1/8)
+    by libjpeg itself, which is much cheaper than a full decode plus resize.
+    
+    Args:
+        data: Encoded image bytes (JPEG from Frigate)
+        target_size: Optional (width, height) bound for the returned image
+    
+    Returns:
+        Fully loaded PIL Image, no larger than target_size if given
+    """
+    with BytesIO(data) as buffer:
+        image = Image.open(buffer)
+        if target_size:
+            image.draft('RGB', target_size)
+        image.load()
+    
+    # draft() only scales by powers of two; finish the resize cheaply
+    if target_size and (image.width > target_size[0] or image.height > target_size[1]):
+        image.thumbnail(target_size, Image.BILINEAR)
+    return image
+
 
 class FrigateClient:
     """Client for interacting with Frigate API."""
     
-    def __init__(self, base_url: str, timeout: int = 30):
+    def __init__(self, base_url: str, timeout: int = 30, snapshot_concurrency: int = 8):
         """
         Initialize Frigate client.
         
         Args:
             base_url: Base URL of Frigate instance (e.g., http://localhost:5000)
             timeout: Request timeout in seconds
+            snapshot_concurrency: Maximum concurrent downloads in get_snapshots_bulk()
         """
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
+        self.snapshot_concurrency = max(1, snapshot_concurrency)
         self.session = requests.Session()
+        
+        # Fixed endpoints, built once
+        self._events_url = f"{self.base_url}/api/events"
+        self._stats_url = f"{self.base_url}/api/stats"
+        
+        # Keep connections to Frigate alive across requests and daemon cycles;
+        # the pool must hold one connection per concurrent snapshot download
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=max(32, self.snapshot_concurrency),
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=[502, 503, 504]
+            )
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Per-thread download buffers, reused across snapshot fetches
+        self._buffers = threading.local()
+        
+        # Download workers, created on first bulk fetch and reused afterwards
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        
+        # Monotonic time of the last successful request (None = never/failed)
+        self._last_ok_at: Optional[float] = None
     
     def test_connection(self) -> bool:
         """
         Test connection to Frigate.
         
+        A success within the last CONNECTION_CHECK_TTL seconds is reused
+        without another round-trip to the stats endpoint.
+        
         Returns:
             True if connection successful, False otherwise
         """
+        if self._last_ok_at is not None and \
+           time.monotonic() - self._last_ok_at < CONNECTION_CHECK_TTL:
+            return True
+        
         try:
             response = self.session.get(
-                f"{self.base_url}/api/stats",
+                self._stats_url,
                 timeout=self.timeout
             )
             response.raise_for_status()
+            self._last_ok_at = time.monotonic()
             logger.info("Successfully connected to Frigate")
             return True
         except requests.RequestException as e:
+            self._last_ok_at = None
             logger.error(f"Failed to connect to Frigate: {e}")
             return False
     
@@ -50,29 +141,37 @@ class FrigateClient:
         lookback_minutes: int = 10,
         cameras: Optional[List[str]] = None,
         labels: Optional[List[str]] = None,
-        has_snapshot: bool = True
+        has_snapshot: bool = True,
+        limit: Optional[int] = None,
+        event_filter: Optional[EventFilter] = None
     ) -> List[Dict]:
         """
         Retrieve recent events from Frigate.
         
+        With an event_filter, events are filtered as they are parsed. If ijson
+        is installed the response is streamed, so rejected events are freed
+        immediately and memory stays bounded even for very large responses.
+        
         Args:
             lookback_minutes: How far back to look for events
             cameras: Filter by specific cameras (None = all)
             labels: Filter by specific labels (None = all)
             has_snapshot: Only return events with snapshots
-            
+            limit: Maximum number of events to return (None = Frigate's default)
+            event_filter: Optional predicate (see compile_filter()); only
+                events it accepts are returned
+        
         Returns:
             List of event dictionaries
         """
         try:
-            # Calculate time range
-            end_time = datetime.now()
-            start_time = end_time - timedelta(minutes=lookback_minutes)
-            
-            # Build query parameters
+            # Build query parameters (epoch seconds, as Frigate expects)
+            now = time.time()
             params = {
-                'before': int(end_time.timestamp()),
-                'after': int(start_time.timestamp()),
+                'before': int(now),
+                'after': int(now - lookback_minutes * 60),
+                # Base64 thumbnails dominate the payload and are never used
+                'include_thumbnails': 0,
             }
             
             if cameras:
@@ -84,20 +183,75 @@ class FrigateClient:
             if has_snapshot:
                 params['has_snapshot'] = 1
             
+            if limit:
+                params['limit'] = limit
+            
+            if event_filter is not None and ijson is not None:
+                return self._stream_events(params, event_filter)
+            
             response = self.session.get(
-                f"{self.base_url}/api/events",
+                self._events_url,
                 params=params,
                 timeout=self.timeout
             )
             response.raise_for_status()
             
-            events = response.json()
+            events = orjson.loads(response.content)
+            self._last_ok_at = time.monotonic()
             logger.info(f"Retrieved {len(events)} events from Frigate")
-            return events
             
-        except requests.RequestException as e:
+            if event_filter is not None:
+                filtered = list(filter(event_filter, events))
+                logger.info(f"Filtered {len(events)} events down to {len(filtered)}")
+                return filtered
+            return events
+        
+        except (requests.RequestException, urllib3.exceptions.HTTPError) as e:
+            # Force the next test_connection() to actually probe Frigate
+            self._last_ok_at = None
             logger.error(f"Failed to retrieve events: {e}")
             return []
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Invalid JSON in events response: {e}")
+            return []
+    
+    def _stream_events(self, params: Dict, event_filter: EventFilter) -> List[Dict]:
+        """
+        Fetch events and filter them while parsing the response incrementally.
+        
+        Args:
+            params: Query parameters for the events endpoint
+            event_filter: Predicate selecting events to keep
+        
+        Returns:
+            List of accepted event dictionaries ([] on invalid JSON)
+        """
+        with self.session.get(
+            self._events_url,
+            params=params,
+            timeout=self.timeout,
+            stream=True
+        ) as response:
+            response.raise_for_status()
+            
+            # Let urllib3 undo any gzip transfer encoding for the parser
+            response.raw.decode_content = True
+            
+            total = 0
+            filtered = []
+            try:
+                for event in ijson.items(response.raw, 'item', use_float=True):
+                    total += 1
+                    if event_filter(event):
+                        filtered.append(event)
+            except ijson.JSONError as e:
+                logger.error(f"Invalid JSON in events response: {e}")
+                return []
+        
+        self._last_ok_at = time.monotonic()
+        logger.info(f"Retrieved {total} events from Frigate")
+        logger.info(f"Filtered {total} events down to {len(filtered)}")
+        return filtered
     
     def get_event_by_id(self, event_id: str) -> Optional[Dict]:
         """
@@ -105,53 +259,52 @@ class FrigateClient:
         
         Args:
             event_id: The event ID
-            
+        
         Returns:
             Event dictionary or None if not found
         """
         try:
             response = self.session.get(
-                f"{self.base_url}/api/events/{event_id}",
+                f"{self._events_url}/{event_id}",
                 timeout=self.timeout
             )
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
         except requests.RequestException as e:
             logger.error(f"Failed to retrieve event {event_id}: {e}")
             return None
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Invalid JSON in response for event {event_id}: {e}")
+            return None
     
     def get_snapshot(
         self,
         event_id: str,
-        clean: bool = True
+        clean: bool = True,
+        target_size: Optional[Tuple[int, int]] = None
     ) -> Optional[Image.Image]:
         """
-        Get snapshot image for an event.
+        Get decoded snapshot image for an event.
+        
+        Prefer get_snapshot_bytes() unless pixel access is actually needed;
+        decoding allocates a full raster for every snapshot.
         
         Args:
             event_id: The event ID
             clean: Use clean snapshot without bounding boxes (recommended for vision models)
-            
+            target_size: Optional (width, height) bound; decodes at reduced scale
+        
         Returns:
             PIL Image object or None if failed
         """
+        data = self.get_snapshot_bytes(event_id, clean=clean)
+        if data is None:
+            return None
+        
         try:
-            # Frigate snapshot endpoint
-            endpoint = f"{self.base_url}/api/events/{event_id}/snapshot.jpg"
-            if clean:
-                endpoint += "?clean=true"
-            
-            response = self.session.get(endpoint, timeout=self.timeout)
-            response.raise_for_status()
-            
-            # Load image
-            image = Image.open(BytesIO(response.content))
+            image = decode_snapshot(data, target_size)
             logger.debug(f"Retrieved snapshot for event {event_id}: {image.size}")
             return image
-            
-        except requests.RequestException as e:
-            logger.error(f"Failed to retrieve snapshot for event {event_id}: {e}")
-            return None
         except Exception as e:
             logger.error(f"Failed to load snapshot image: {e}")
             return None
@@ -167,110 +320,235 @@ class FrigateClient:
         Args:
             event_id: The event ID
             clean: Use clean snapshot without bounding boxes
-            
+        
         Returns:
             Image bytes or None if failed
         """
         try:
-            endpoint = f"{self.base_url}/api/events/{event_id}/snapshot.jpg"
-            if clean:
-                endpoint += "?clean=true"
+            endpoint = f"{self._events_url}/{event_id}/snapshot.jpg"
+            params = {'clean': 'true'} if clean else None
             
-            response = self.session.get(endpoint, timeout=self.timeout)
-            response.raise_for_status()
-            
-            logger.debug(f"Retrieved snapshot bytes for event {event_id}: {len(response.content)} bytes")
-            return response.content
+            with self.session.get(
+                endpoint,
+                params=params,
+                headers=SNAPSHOT_HEADERS,
+                stream=True,
+                timeout=self.timeout
+            ) as response:
+                response.raise_for_status()
+                
+                # Stream into this thread's reusable buffer
+                buffer = self._snapshot_buffer()
+                for chunk in response.iter_content(chunk_size=SNAPSHOT_CHUNK_SIZE):
+                    buffer.write(chunk)
             
+            data = buffer.getvalue()
+            logger.debug(f"Retrieved snapshot bytes for event {event_id}: {len(data)} bytes")
+            return data
+        
         except requests.RequestException as e:
             logger.error(f"Failed to retrieve snapshot bytes for event {event_id}: {e}")
             return None
     
+    def _snapshot_buffer(self) -> BytesIO:
+        """Get the calling thread's download buffer, emptied for reuse."""
+        buffer = getattr(self._buffers, 'buffer', None)
+        if buffer is None:
+            buffer = self._buffers.buffer = BytesIO()
+        buffer.seek(0)
+        buffer.truncate()
+        return buffer
+    
+    def get_snapshots_bulk(
+        self,
+        event_ids: Iterable[str],
+        clean: bool = True
+    ) -> Dict[str, Optional[bytes]]:
+        """
+        Get snapshot image bytes for several events concurrently.
+        
+        Requests are dispatched from a persistent pool of snapshot_concurrency
+        threads over the shared session, so downloads overlap instead of
+        paying one round-trip each, and no threads are spawned per batch.
+        
+        Args:
+            event_ids: The event IDs
+            clean: Use clean snapshot without bounding boxes
+        
+        Returns:
+            Dictionary mapping event ID to image bytes (None if failed),
+            in the same order as event_ids
+        """
+        event_ids = list(event_ids)
+        if not event_ids:
+            return {}
+        
+        snapshots: Dict[str, Optional[bytes]] = {event_id: None for event_id in event_ids}
+        
+        executor = self._download_executor()
+        futures = {
+            executor.submit(self.get_snapshot_bytes, event_id, clean): event_id
+            for event_id in event_ids
+        }
+        for future in as_completed(futures):
+            snapshots[futures[future]] = future.result()
+        
+        logger.debug(f"Retrieved {sum(1 for s in snapshots.values() if s)}/{len(event_ids)} snapshots")
+        return snapshots
+    
+    def _download_executor(self) -> ThreadPoolExecutor:
+        """Return the shared snapshot download pool, creating it on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.snapshot_concurrency,
+                    thread_name_prefix="snapshot"
+                )
+            return self._executor
+    
+    def close(self) -> None:
+        """Stop the snapshot download workers and close pooled connections."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+        self.session.close()
+    
     def get_snapshot_timestamp(self, event: Dict) -> Optional[float]:
         """
         Extract the snapshot timestamp from an event.
         
         Args:
             event: Event dictionary from Frigate
-            
+        
         Returns:
             Timestamp as float or None
         """
-        try:
-            # Try different possible fields
-            if 'snapshot' in event and 'frame_time' in event['snapshot']:
-                return event['snapshot']['frame_time']
-            elif 'start_time' in event:
-                return event['start_time']
-            else:
-                logger.warning(f"Could not find snapshot timestamp in event {event.get('id', 'unknown')}")
-                return None
-        except Exception as e:
-            logger.error(f"Error extracting snapshot timestamp: {e}")
-            return None
+        # Frigate sends "snapshot": null for events without snapshot metadata
+        snapshot = event.get('snapshot')
+        if snapshot and 'frame_time' in snapshot:
+            return snapshot['frame_time']
+        
+        start_time = event.get('start_time')
+        if start_time is not None:
+            return start_time
+        
+        logger.warning(f"Could not find snapshot timestamp in event {event.get('id', 'unknown')}")
+        return None
     
-    def filter_events(
-        self,
-        events: List[Dict],
+    @staticmethod
+    def compile_filter(
         min_confidence: float = 0.0,
         allowed_labels: Optional[List[str]] = None,
         reject_labels: Optional[List[str]] = None,
         exclude_cameras: Optional[List[str]] = None,
         include_cameras: Optional[List[str]] = None
-    ) -> List[Dict]:
+    ) -> EventFilter:
         """
-        Filter events based on rules.
+        Build a predicate that applies the filtering rules to one event.
         
         Args:
-            events: List of events to filter
             min_confidence: Minimum confidence threshold
             allowed_labels: Only these labels (None = all)
             reject_labels: Exclude these labels
             exclude_cameras: Exclude these cameras
             include_cameras: Only these cameras (None = all)
-            
+        
         Returns:
-            Filtered list of events
+            Function returning True for events that should be reviewed
         """
-        filtered = []
+        # Set lookups instead of list scans; built once per predicate
+        allowed = frozenset(allowed_labels) if allowed_labels else None
+        reject = frozenset(reject_labels) if reject_labels else None
+        include = frozenset(include_cameras) if include_cameras else None
+        exclude = frozenset(exclude_cameras) if exclude_cameras else None
         
-        for event in events:
+        def event_filter(event: Dict) -> bool:
+            debug = logger.isEnabledFor(logging.DEBUG)
+            
             # Check snapshot exists
             if not event.get('has_snapshot'):
-                logger.debug(f"Event {event['id']} has no snapshot, skipping")
-                continue
+                if debug:
+                    logger.debug(f"Event {event['id']} has no snapshot, skipping")
+                return False
             
             # Check confidence
             if event.get('data', {}).get('score', 1.0) < min_confidence:
-                logger.debug(f"Event {event['id']} below confidence threshold, skipping")
-                continue
+                if debug:
+                    logger.debug(f"Event {event['id']} below confidence threshold, skipping")
+                return False
             
             label = event.get('label', '')
             camera = event.get('camera', '')
             
             # Check reject labels
-            if reject_labels and label in reject_labels:
-                logger.debug(f"Event {event['id']} has rejected label '{label}', skipping")
-                continue
+            if reject and label in reject:
+                if debug:
+                    logger.debug(f"Event {event['id']} has rejected label '{label}', skipping")
+                return False
             
             # Check allowed labels
-            if allowed_labels and label not in allowed_labels:
-                logger.debug(f"Event {event['id']} label '{label}' not in allowed list, skipping")
-                continue
+            if allowed and label not in allowed:
+                if debug:
+                    logger.debug(f"Event {event['id']} label '{label}' not in allowed list, skipping")
+                return False
             
             # Check cameras
-            if include_cameras and camera not in include_cameras:
-                logger.debug(f"Event {event['id']} camera '{camera}' not in include list, skipping")
-                continue
+            if include and camera not in include:
+                if debug:
+                    logger.debug(f"Event {event['id']} camera '{camera}' not in include list, skipping")
+                return False
             
-            if exclude_cameras and camera in exclude_cameras:
-                logger.debug(f"Event {event['id']} camera '{camera}' in exclude list, skipping")
-                continue
+            if exclude and camera in exclude:
+                if debug:
+                    logger.debug(f"Event {event['id']} camera '{camera}' in exclude list, skipping")
+                return False
             
-            filtered.append(event)
+            return True
         
-        logger.info(f"Filtered {len(events)} events down to {len(filtered)}")
-        return filtered
+        return event_filter
+    
+    def filter_events(
+        self,
+        events: Iterable[Dict],
+        min_confidence: float = 0.0,
+        allowed_labels: Optional[List[str]] = None,
+        reject_labels: Optional[List[str]] = None,
+        exclude_cameras: Optional[List[str]] = None,
+        include_cameras: Optional[List[str]] = None
+    ) -> Iterator[Dict]:
+        """
+        Filter events based on rules.
+        
+        Events are yielded lazily, so any iterable (including a stream) can
+        be filtered without materializing it; wrap in list() if needed.
+        
+        Args:
+            events: Events to filter
+            min_confidence: Minimum confidence threshold
+            allowed_labels: Only these labels (None = all)
+            reject_labels: Exclude these labels
+            exclude_cameras: Exclude these cameras
+            include_cameras: Only these cameras (None = all)
+        
+        Yields:
+            Events that pass the rules
+        """
+        event_filter = self.compile_filter(
+            min_confidence=min_confidence,
+            allowed_labels=allowed_labels,
+            reject_labels=reject_labels,
+            exclude_cameras=exclude_cameras,
+            include_cameras=include_cameras
+        )
+        total = kept = 0
+        for event in events:
+            total += 1
+            if event_filter(event):
+                kept += 1
+                yield event
+        
+        logger.info(f"Filtered {total} events down to {kept}")
     
     def mark_event_reviewed(
         self,
@@ -285,7 +563,7 @@ class FrigateClient:
         Args:
             event_id: The event ID
             reviewed: True to mark as reviewed, False to unmark
-            
+        
         Returns:
             True if successful, False otherwise
         """
@@ -301,7 +579,7 @@ class FrigateClient:
             
             logger.info(f"Marked event {event_id} as reviewed in Frigate")
             return True
-            
+        
         except requests.HTTPError as e:
             # If review endpoint doesn't exist, try alternative method
             if e.response.status_code == 404 or e.response.status_code == 405:
@@ -324,7 +602,7 @@ class FrigateClient:
             else:
                 logger.debug(f"Could not mark event as reviewed: {e}")
                 return False
-            
+        
         except requests.RequestException as e:
             logger.debug(f"Could not mark event as reviewed: {e}")
             return False
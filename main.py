@@ -5,19 +5,45 @@ Automatic review and submission of Frigate detection events using vision AI.
 """
 
 import argparse
+import atexit
+import functools
 import logging
+import os
+import queue
+import signal
 import sys
+import threading
 import time
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
+import msgspec
+import orjson
 import yaml
 
-from frigate_client import FrigateClient
+from config import Config, parse_config
+from frigate_client import EventFilter, FrigateClient
 from vision_client import create_vision_client
 from submitter import FrigatePlusSubmitter
 from state_manager import StateManager
 from reviewer import EventReviewer
+from event_listener import FrigateEventListener
+
+# Use the libyaml C loader when PyYAML was built with it
+YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+class OrjsonFormatter(logging.Formatter):
+    """Formats log records as one JSON object per line."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        return orjson.dumps({
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'module': record.name,
+            'message': record.getMessage()
+        }).decode()
 
 
 def setup_logging(log_level: str, log_file: Optional[str] = None, json_format: bool = False):
@@ -34,10 +60,7 @@ def setup_logging(log_level: str, log_file: Optional[str] = None, json_format: b
     
     # Create formatter
     if json_format:
-        formatter = logging.Formatter(
-            '{"time": "%(asctime)s", "level": "%(levelname)s", '
-            '"module": "%(name)s", "message": "%(message)s"}'
-        )
+        formatter = OrjsonFormatter()
     else:
         formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -51,30 +74,53 @@ def setup_logging(log_level: str, log_file: Optional[str] = None, json_format: b
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(numeric_level)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+    handlers = [console_handler]
     
     # File handler (optional)
     if log_file:
         file_handler = logging.FileHandler(log_file)
         file_handler.setLevel(numeric_level)
         file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    # Format and write records on a background thread; logging calls only enqueue
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    if log_file:
         logging.info(f"Logging to file: {log_file}")
 
 
-def load_config(config_path: str) -> dict:
+def _or_default(value, default):
+    """Return value, or default if the setting was left unset (None)."""
+    return default if value is None else value
+
+
+@functools.lru_cache(maxsize=4)
+def _parse_config(config_path: str, mtime_ns: int) -> Config:
+    """Parse and validate a YAML config file, cached until the file is modified."""
+    with open(config_path, 'r') as f:
+        return parse_config(yaml.load(f, Loader=YamlLoader))
+
+
+def load_config(config_path: str) -> Config:
     """
-    Load configuration from YAML file.
+    Load and validate configuration from YAML file.
+    
+    Repeated loads of an unchanged file return the cached (shared) Config.
     
     Args:
         config_path: Path to config.yaml
         
     Returns:
-        Configuration dictionary
+        Validated configuration
     """
     try:
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        mtime_ns = os.stat(config_path).st_mtime_ns
+        config = _parse_config(config_path, mtime_ns)
         logging.info(f"Loaded configuration from {config_path}")
         return config
     except FileNotFoundError:
@@ -83,156 +129,309 @@ def load_config(config_path: str) -> dict:
     except yaml.YAMLError as e:
         logging.error(f"Invalid YAML in configuration file: {e}")
         sys.exit(1)
+    except msgspec.ValidationError as e:
+        logging.error(f"Invalid configuration: {e}")
+        sys.exit(1)
 
 
-def validate_config(config: dict) -> bool:
+def build_reviewer(config: Config, dry_run: bool = False) -> EventReviewer:
     """
-    Validate configuration has required fields.
+    Construct the clients and the event reviewer.
     
-    Args:
-        config: Configuration dictionary
-        
-    Returns:
-        True if valid, exits otherwise
-    """
-    required_sections = ['frigate', 'vision_model', 'review_rules', 'processing']
-    
-    for section in required_sections:
-        if section not in config:
-            logging.error(f"Missing required configuration section: {section}")
-            return False
-    
-    # Validate Frigate config
-    frigate_config = config['frigate']
-    if not frigate_config.get('base_url'):
-        logging.error("Missing frigate.base_url in configuration")
-        return False
-    if not frigate_config.get('plus_api_key'):
-        logging.error("Missing frigate.plus_api_key in configuration")
-        return False
-    
-    # Validate vision model config
-    vision_config = config['vision_model']
-    if not vision_config.get('provider'):
-        logging.error("Missing vision_model.provider in configuration")
-        return False
-    if not vision_config.get('api_key'):
-        logging.error("Missing vision_model.api_key in configuration")
-        return False
-    
-    return True
-
-
-def run_once(config: dict, dry_run: bool = False):
-    """
-    Run a single review cycle.
+    The returned reviewer (and the HTTP sessions it holds) is meant to be
+    reused across review cycles so connections stay alive between polls.
     
     Args:
-        config: Configuration dictionary
+        config: Application configuration
         dry_run: If True, don't actually submit to Frigate+
+        
+    Returns:
+        EventReviewer wired to all clients
     """
-    logging.info("Starting single review cycle")
-    
-    # Initialize clients
     frigate_client = FrigateClient(
-        base_url=config['frigate']['base_url'],
-        timeout=30
+        base_url=config.frigate.base_url,
+        timeout=30,
+        snapshot_concurrency=config.processing.snapshot_concurrency
     )
     
     vision_client = create_vision_client(
-        provider=config['vision_model']['provider'],
-        api_key=config['vision_model']['api_key'],
-        model_name=config['vision_model']['model_name'],
-        endpoint_url=config['vision_model'].get('endpoint_url'),
-        timeout=config['vision_model'].get('timeout_seconds', 30)
+        provider=config.vision_model.provider,
+        api_key=config.vision_model.api_key,
+        model_name=config.vision_model.model_name,
+        endpoint_url=config.vision_model.endpoint_url,
+        timeout=config.vision_model.timeout_seconds
     )
     
     submitter = FrigatePlusSubmitter(
-        base_url=config['frigate']['base_url'],
-        plus_api_key=config['frigate']['plus_api_key'],
+        base_url=config.frigate.base_url,
+        plus_api_key=config.frigate.plus_api_key,
         timeout=30
     )
     
     state_manager = StateManager(
-        state_file=config['processing'].get('state_file', 'state.json')
+        state_file=config.processing.state_file,
+        durable=config.processing.durable_state
     )
     
-    # Test connection
-    if not frigate_client.test_connection():
-        logging.error("Cannot connect to Frigate. Exiting.")
-        sys.exit(1)
-    
-    # Initialize reviewer
-    reviewer = EventReviewer(
+    return EventReviewer(
         frigate_client=frigate_client,
         vision_client=vision_client,
         submitter=submitter,
         state_manager=state_manager,
-        min_confidence=config['review_rules'].get('min_confidence', 0.5),
-        dry_run=dry_run or config['processing'].get('dry_run', False),
-        submission_method=config['processing'].get('submission_method', 'snapshot'),
-        mark_as_reviewed=config['processing'].get('mark_as_reviewed', True)
+        min_confidence=_or_default(config.review_rules.min_confidence, 0.5),
+        dry_run=dry_run or config.processing.dry_run,
+        submission_method=config.processing.submission_method,
+        mark_as_reviewed=config.processing.mark_as_reviewed,
+        batch_vision=config.vision_model.batch_requests,
+        concurrency=config.processing.review_concurrency,
+        vision_concurrency=config.vision_model.max_concurrency,
+        dedupe_distance=config.processing.dedupe_distance
+    )
+
+
+def build_event_filter(config: Config) -> EventFilter:
+    """
+    Build the event filter predicate from the review rules.
+    
+    Args:
+        config: Application configuration
+        
+    Returns:
+        Predicate returning True for events that should be reviewed
+    """
+    return FrigateClient.compile_filter(
+        min_confidence=_or_default(config.review_rules.min_confidence, 0.0),
+        allowed_labels=config.review_rules.allowed_labels,
+        reject_labels=config.review_rules.reject_labels,
+        exclude_cameras=config.review_rules.exclude_cameras,
+        include_cameras=config.review_rules.include_cameras
     )
+
+
+def run_once(
+    reviewer: EventReviewer,
+    config: Config,
+    event_filter: Optional[EventFilter] = None
+) -> int:
+    """
+    Run a single review cycle.
     
-    # Get events
-    lookback_minutes = config['frigate'].get('event_lookback_minutes', 10)
+    Args:
+        reviewer: Event reviewer built by build_reviewer()
+        config: Application configuration
+        event_filter: Predicate from build_event_filter() (built here if None)
+        
+    Returns:
+        Number of events left for a later cycle by max_events_per_run
+    """
+    logging.info("Starting single review cycle")
+    
+    frigate_client = reviewer.frigate_client
+    
+    # Test connection
+    if not frigate_client.test_connection():
+        logging.error("Cannot connect to Frigate. Exiting.")
+        sys.exit(1)
+    
+    # Get events, filtered while the response is parsed
+    lookback_minutes = config.frigate.event_lookback_minutes
     events = frigate_client.get_events(
         lookback_minutes=lookback_minutes,
-        has_snapshot=True
+        has_snapshot=True,
+        event_filter=event_filter or build_event_filter(config)
     )
     
     if not events:
-        logging.info("No events found")
-        return
+        logging.info("No events to review")
+        return 0
     
-    # Filter events
-    filtered_events = frigate_client.filter_events(
-        events=events,
-        min_confidence=config['review_rules'].get('min_confidence', 0.0),
-        allowed_labels=config['review_rules'].get('allowed_labels'),
-        reject_labels=config['review_rules'].get('reject_labels'),
-        exclude_cameras=config['review_rules'].get('exclude_cameras'),
-        include_cameras=config['review_rules'].get('include_cameras')
-    )
+    return review_events(reviewer, config, events)
+
+
+def review_events(reviewer: EventReviewer, config: Config, events: List[Dict]) -> int:
+    """
+    Review a list of Frigate events that passed the event filter.
+    
+    Args:
+        reviewer: Event reviewer built by build_reviewer()
+        config: Application configuration
+        events: Filtered event dictionaries from Frigate
+        
+    Returns:
+        Number of events left for a later cycle by max_events_per_run
+    """
+    # Drop events reviewed in earlier cycles before they use up the batch limit
+    seen = reviewer.state_manager.already_reviewed(e['id'] for e in events)
+    if seen:
+        logging.info(f"Skipping {len(seen)} already reviewed events")
+        events = [e for e in events if e['id'] not in seen]
     
     # Limit batch size
-    max_events = config['processing'].get('max_events_per_run', 20)
-    if len(filtered_events) > max_events:
-        logging.info(f"Limiting to {max_events} events (found {len(filtered_events)})")
-        filtered_events = filtered_events[:max_events]
+    max_events = config.processing.max_events_per_run
+    deferred = max(0, len(events) - max_events)
+    if deferred:
+        logging.info(f"Limiting to {max_events} events (found {len(events)})")
+        events = events[:max_events]
     
     # Review batch
-    stats = reviewer.review_batch(filtered_events)
+    stats = reviewer.review_batch(events)
     
     logging.info(f"Review cycle complete: {stats}")
+    return deferred
 
 
-def run_daemon(config: dict, dry_run: bool = False):
+def start_event_listener(config: Config) -> Optional[FrigateEventListener]:
+    """
+    Start the MQTT event listener.
+    
+    Args:
+        config: Application configuration
+        
+    Returns:
+        Running FrigateEventListener, or None if it could not be started
+    """
+    mqtt_config = config.mqtt
+    if mqtt_config is None:
+        logging.error("Missing mqtt section in configuration, falling back to polling")
+        return None
+    
+    try:
+        listener = FrigateEventListener(
+            host=mqtt_config.host,
+            port=mqtt_config.port,
+            username=mqtt_config.username,
+            password=mqtt_config.password,
+            topic_prefix=mqtt_config.topic_prefix
+        )
+        listener.start()
+        return listener
+    except Exception as e:
+        logging.error(f"Failed to start MQTT listener, falling back to polling: {e}")
+        return None
+
+
+def run_mqtt_cycle(
+    reviewer: EventReviewer,
+    config: Config,
+    listener: FrigateEventListener,
+    event_filter: EventFilter
+):
+    """
+    Run one event-driven review cycle.
+    
+    Waits up to poll_interval_seconds for finished events from MQTT and
+    reviews them. Falls back to an HTTP poll after (re)connecting to the
+    broker, when events may have been missed, and while it is unreachable.
+    Events a cycle can't review yet (over max_events_per_run, or whose
+    record couldn't be fetched) trigger a catch-up poll on the next cycle,
+    since their MQTT messages won't be delivered again.
+    
+    Args:
+        reviewer: Event reviewer built by build_reviewer()
+        config: Application configuration
+        listener: Running MQTT event listener
+        event_filter: Predicate from build_event_filter()
+    """
+    if listener.needs_resync() or not listener.is_connected():
+        if run_once(reviewer, config, event_filter):
+            listener.request_resync()
+    
+    poll_interval = config.frigate.poll_interval_seconds
+    event_ids = listener.wait_for_events(timeout=poll_interval)
+    if not event_ids:
+        return
+    
+    logging.info(f"Received {len(event_ids)} finished events via MQTT")
+    
+    # MQTT payloads differ from the API's; fetch the canonical event records
+    events = []
+    deferred = 0
+    for event_id in event_ids:
+        event = reviewer.frigate_client.get_event_by_id(event_id)
+        if event is None:
+            # Fetch failed; catch it on a later poll
+            deferred += 1
+        elif event_filter(event):
+            # Events recorded without a snapshot fail the filter and are
+            # dropped; a catch-up poll only returns events with snapshots
+            events.append(event)
+    
+    if events:
+        deferred += review_events(reviewer, config, events)
+    
+    if deferred:
+        logging.info(f"Deferring {deferred} events to a catch-up poll")
+        listener.request_resync()
+
+
+def run_daemon(config: Config, dry_run: bool = False):
     """
     Run continuously in daemon mode.
     
+    Polls are scheduled on a fixed monotonic cadence, so long review cycles
+    don't push later polls back. SIGTERM (or Ctrl+C) stops the daemon
+    promptly, without waiting for the current sleep to finish.
+    
     Args:
-        config: Configuration dictionary
+        config: Application configuration
         dry_run: If True, don't actually submit to Frigate+
     """
     logging.info("Starting daemon mode")
     
-    poll_interval = config['frigate'].get('poll_interval_seconds', 60)
+    poll_interval = config.frigate.poll_interval_seconds
+    
+    # Build clients once so HTTP connections are reused across cycles,
+    # and the filter rules once since they don't change between cycles
+    reviewer = build_reviewer(config, dry_run)
+    event_filter = build_event_filter(config)
+    
+    # Event-driven mode: MQTT push, with HTTP polling as the fallback
+    listener = None
+    if config.frigate.daemon_mode == 'mqtt':
+        listener = start_event_listener(config)
+    
+    stop = threading.Event()
+    
+    def handle_sigterm(signum, frame):
+        logging.info("Received SIGTERM, shutting down")
+        stop.set()
+        if listener:
+            listener.wake()
+    
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    
+    start = time.monotonic()
+    cycle = 0
     
     try:
-        while True:
+        while not stop.is_set():
             try:
-                run_once(config, dry_run)
+                if listener:
+                    # Blocks on the event queue, no sleep needed
+                    run_mqtt_cycle(reviewer, config, listener, event_filter)
+                    continue
+                run_once(reviewer, config, event_filter)
             except KeyboardInterrupt:
                 raise
             except Exception as e:
                 logging.error(f"Error in review cycle: {e}", exc_info=True)
+                if listener:
+                    stop.wait(poll_interval)
+                    continue
             
-            logging.info(f"Sleeping for {poll_interval} seconds...")
-            time.sleep(poll_interval)
+            # Next tick on the fixed schedule, skipping any that were overrun
+            now = time.monotonic()
+            cycle = max(cycle + 1, int((now - start) // poll_interval) + 1)
+            delay = start + cycle * poll_interval - now
+            logging.info(f"Sleeping for {delay:.0f} seconds...")
+            stop.wait(delay)
     
     except KeyboardInterrupt:
         logging.info("Received interrupt signal, shutting down")
+    finally:
+        if listener:
+            listener.stop()
+        reviewer.close()
 
 
 def main():
@@ -282,20 +481,19 @@ def main():
     config = load_config(args.config)
     
     # Setup logging
-    log_level = 'DEBUG' if args.verbose else config.get('logging', {}).get('level', 'INFO')
-    log_file = args.log or config.get('logging', {}).get('file')
-    json_format = config.get('logging', {}).get('json_format', False)
+    log_level = 'DEBUG' if args.verbose else config.logging.level
+    log_file = args.log or config.logging.file
+    json_format = config.logging.json_format
     
     setup_logging(log_level, log_file, json_format)
     
-    # Validate config
-    if not validate_config(config):
-        logging.error("Configuration validation failed")
-        sys.exit(1)
-    
     # Determine run mode
     if args.once:
-        run_once(config, args.dry_run)
+        reviewer = build_reviewer(config, args.dry_run)
+        try:
+            run_once(reviewer, config)
+        finally:
+            reviewer.close()
     else:
         # Default to daemon mode
         run_daemon(config, args.dry_run)
@@ -1,7 +1,16 @@
 """Core review logic orchestrating the entire workflow."""
 
+import asyncio
+import contextlib
 import logging
-from typing import Dict, List, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from PIL import Image
 
 from frigate_client import FrigateClient
 from vision_client import VisionClient, VisionModelResponse
@@ -10,6 +19,42 @@ from state_manager import StateManager
 
 logger = logging.getLogger(__name__)
 
+# Snapshot fingerprints are DHASH_SIZE x DHASH_SIZE-bit difference hashes
+DHASH_SIZE = 8
+
+# Number of recent vision results kept for near-duplicate reuse
+ANALYSIS_CACHE_SIZE = 256
+
+
+def snapshot_dhash(snapshot: Union[Image.Image, bytes]) -> int:
+    """
+    Compute a perceptual difference hash (dHash) of a snapshot.
+    
+    Visually similar images hash to values a small Hamming distance apart.
+    
+    Args:
+        snapshot: Snapshot image or encoded image bytes
+        
+    Returns:
+        64-bit hash as an int
+    """
+    if isinstance(snapshot, bytes):
+        with BytesIO(snapshot) as buffer:
+            image = Image.open(buffer)
+            # Only a 9x8 thumbnail is needed; let libjpeg decode at reduced scale
+            image.draft('L', (DHASH_SIZE * 4, DHASH_SIZE * 4))
+            image = image.convert('L')
+    else:
+        image = snapshot.convert('L')
+    
+    # One bit per horizontally adjacent pixel pair: is the left one darker?
+    pixels = image.resize((DHASH_SIZE + 1, DHASH_SIZE), Image.BILINEAR).tobytes()
+    value = 0
+    for row in range(0, len(pixels), DHASH_SIZE + 1):
+        for col in range(row, row + DHASH_SIZE):
+            value = (value << 1) | (pixels[col] < pixels[col + 1])
+    return value
+
 
 class ReviewDecision:
     """Represents a review decision."""
@@ -20,6 +65,8 @@ class ReviewDecision:
     SKIPPED = "skipped"
     ERROR = "error"
     
+    __slots__ = ('decision', 'original_label', 'corrected_label', 'confidence', 'notes')
+    
     def __init__(
         self,
         decision: str,
@@ -53,7 +100,11 @@ class EventReviewer:
         min_confidence: float = 0.5,
         dry_run: bool = False,
         submission_method: str = "snapshot",
-        mark_as_reviewed: bool = True
+        mark_as_reviewed: bool = True,
+        batch_vision: bool = False,
+        concurrency: int = 4,
+        dedupe_distance: Optional[int] = None,
+        vision_concurrency: Optional[int] = None
     ):
         """
         Initialize the event reviewer.
@@ -67,6 +118,12 @@ class EventReviewer:
             dry_run: If True, don't actually submit to Frigate+
             submission_method: "snapshot" or "event"
             mark_as_reviewed: If True, mark events as reviewed in Frigate after submission
+            batch_vision: If True, analyze each batch in one multi-image vision request
+            concurrency: Maximum number of submissions in flight at the same time
+            dedupe_distance: Reuse the vision result of a recent snapshot with the
+                same label whose dHash is within this many bits (None = disabled)
+            vision_concurrency: Maximum number of vision requests in flight
+                (None = same as concurrency)
         """
         self.frigate_client = frigate_client
         self.vision_client = vision_client
@@ -76,6 +133,98 @@ class EventReviewer:
         self.dry_run = dry_run
         self.submission_method = submission_method
         self.mark_as_reviewed = mark_as_reviewed
+        self.batch_vision = batch_vision
+        self.concurrency = max(1, concurrency)
+        self.vision_concurrency = max(1, vision_concurrency or self.concurrency)
+        
+        # Submission handler per decision; other decisions aren't submitted
+        self._submit_handlers = {
+            ReviewDecision.INVALID: self._submit_invalid,
+            ReviewDecision.VALID: self._submit_label,
+            ReviewDecision.CORRECTED: self._submit_label
+        }
+        
+        # Vision calls get their own workers so they never queue behind
+        # snapshot downloads or Frigate+ submissions (and vice versa); the
+        # pool size is the per-provider request limit
+        self._vision_pool = ThreadPoolExecutor(
+            max_workers=self.vision_concurrency,
+            thread_name_prefix="vision"
+        )
+        
+        # Recent vision results by (snapshot dHash, label), oldest first
+        self.dedupe_distance = dedupe_distance
+        self._analysis_cache: "OrderedDict[Tuple[int, str], VisionModelResponse]" = OrderedDict()
+        self._analysis_cache_lock = threading.Lock()
+    
+    @staticmethod
+    def _is_reviewable(event: Dict) -> Tuple[bool, str]:
+        """
+        Check from event metadata alone whether an event can be reviewed.
+        
+        Args:
+            event: Event dictionary from Frigate
+            
+        Returns:
+            (reviewable, reason) where reason explains a False result
+        """
+        if not event.get('id'):
+            return False, "no event ID"
+        
+        if not event.get('has_snapshot'):
+            return False, "no snapshot"
+        
+        # A missing score is fine; an explicit non-positive one is not
+        score = (event.get('data') or {}).get('score')
+        if score is not None and score <= 0:
+            return False, "zero detection score"
+        
+        return True, ""
+    
+    def analyze_snapshot(
+        self,
+        snapshot: Union[Image.Image, bytes],
+        original_label: str
+    ) -> Optional[VisionModelResponse]:
+        """
+        Analyze a snapshot, reusing the result for a near-duplicate if enabled.
+        
+        Consecutive events from the same track often have almost identical
+        snapshots; with dedupe_distance set, those skip the vision model.
+        
+        Args:
+            snapshot: Snapshot image or encoded image bytes
+            original_label: Label Frigate assigned
+            
+        Returns:
+            VisionModelResponse or None if analysis failed
+        """
+        if self.dedupe_distance is None:
+            return self.vision_client.analyze_image(snapshot, original_label)
+        
+        try:
+            fingerprint = snapshot_dhash(snapshot)
+        except OSError as e:
+            logger.warning("Could not fingerprint snapshot: %s", e)
+            return self.vision_client.analyze_image(snapshot, original_label)
+        
+        with self._analysis_cache_lock:
+            for key, response in reversed(self._analysis_cache.items()):
+                cached_hash, cached_label = key
+                if (cached_label == original_label
+                        and (cached_hash ^ fingerprint).bit_count() <= self.dedupe_distance):
+                    self._analysis_cache.move_to_end(key)
+                    logger.debug("Reusing vision result for near-duplicate %s snapshot", original_label)
+                    return response
+        
+        response = self.vision_client.analyze_image(snapshot, original_label)
+        if response:
+            with self._analysis_cache_lock:
+                self._analysis_cache[(fingerprint, original_label)] = response
+                self._analysis_cache.move_to_end((fingerprint, original_label))
+                if len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+                    self._analysis_cache.popitem(last=False)
+        return response
     
     def make_decision(
         self,
@@ -92,9 +241,15 @@ class EventReviewer:
         Returns:
             ReviewDecision
         """
-        # Check confidence threshold
-        if vision_response.confidence < self.min_confidence:
-            logger.info(f"Low confidence ({vision_response.confidence}), skipping")
+        decision = self._classify(
+            vision_response.confidence < self.min_confidence,
+            vision_response.object_present,
+            vision_response.correct_label,
+            original_label
+        )
+        
+        if decision == ReviewDecision.SKIPPED:
+            logger.info("Low confidence (%s), skipping", vision_response.confidence)
             return ReviewDecision(
                 decision=ReviewDecision.SKIPPED,
                 original_label=original_label,
@@ -102,8 +257,7 @@ class EventReviewer:
                 notes="Confidence below threshold"
             )
         
-        # No object present -> invalid
-        if not vision_response.object_present:
+        if decision == ReviewDecision.INVALID:
             logger.info("No object present, marking as invalid")
             return ReviewDecision(
                 decision=ReviewDecision.INVALID,
@@ -112,25 +266,21 @@ class EventReviewer:
                 notes=vision_response.notes
             )
         
-        # Object present with same label -> valid
-        if vision_response.correct_label and \
-           vision_response.correct_label.lower() == original_label.lower():
-            logger.info(f"Label confirmed: {original_label}")
+        if decision == ReviewDecision.CORRECTED:
+            logger.info("Label corrected: %s -> %s", original_label, vision_response.correct_label)
             return ReviewDecision(
-                decision=ReviewDecision.VALID,
+                decision=ReviewDecision.CORRECTED,
                 original_label=original_label,
+                corrected_label=vision_response.correct_label,
                 confidence=vision_response.confidence,
                 notes=vision_response.notes
             )
         
-        # Object present with different label -> corrected
-        if vision_response.correct_label and \
-           vision_response.correct_label.lower() != original_label.lower():
-            logger.info(f"Label corrected: {original_label} -> {vision_response.correct_label}")
+        if vision_response.correct_label:
+            logger.info("Label confirmed: %s", original_label)
             return ReviewDecision(
-                decision=ReviewDecision.CORRECTED,
+                decision=ReviewDecision.VALID,
                 original_label=original_label,
-                corrected_label=vision_response.correct_label,
                 confidence=vision_response.confidence,
                 notes=vision_response.notes
             )
@@ -144,12 +294,56 @@ class EventReviewer:
             notes="Object present but label unclear"
         )
     
-    def review_event(self, event: Dict) -> Optional[ReviewDecision]:
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _classify(
+        below_threshold: bool,
+        object_present: bool,
+        correct_label: Optional[str],
+        original_label: str
+    ) -> str:
+        """
+        Map a vision model verdict to a decision (pure, so results are cached).
+        
+        Args:
+            below_threshold: Whether the model's confidence is below min_confidence
+            object_present: Whether the model saw the object
+            correct_label: Label the model assigned (None/empty if unsure)
+            original_label: Label Frigate assigned
+            
+        Returns:
+            One of the ReviewDecision decision constants
+        """
+        # Check confidence threshold
+        if below_threshold:
+            return ReviewDecision.SKIPPED
+        
+        # No object present -> invalid
+        if not object_present:
+            return ReviewDecision.INVALID
+        
+        # Object present: same label -> valid, different label -> corrected
+        if correct_label:
+            if correct_label.lower() == original_label.lower():
+                return ReviewDecision.VALID
+            return ReviewDecision.CORRECTED
+        
+        # Object present but no label provided
+        return ReviewDecision.VALID
+    
+    def review_event(
+        self,
+        event: Dict,
+        snapshot: Optional[Union[Image.Image, bytes]] = None,
+        vision_response: Optional[VisionModelResponse] = None
+    ) -> Optional[ReviewDecision]:
         """
         Review a single event.
         
         Args:
             event: Event dictionary from Frigate
+            snapshot: Prefetched snapshot (fetched from Frigate if None)
+            vision_response: Precomputed vision analysis (analyzed here if None)
             
         Returns:
             ReviewDecision or None if review failed
@@ -158,22 +352,48 @@ class EventReviewer:
         camera_name = event.get('camera')
         original_label = event.get('label')
         
-        logger.info(f"Reviewing event {event_id}: {camera_name}/{original_label}")
+        logger.info("Reviewing event %s: %s/%s", event_id, camera_name, original_label)
+        
+        # Get snapshot unless it was prefetched (raw bytes, no decode needed)
+        if snapshot is None:
+            snapshot = self.frigate_client.get_snapshot_bytes(event_id, clean=True)
+        
+        # Analyze with vision model unless a batch request already did
+        if snapshot and vision_response is None:
+            vision_response = self.analyze_snapshot(snapshot, original_label)
+        
+        return self._conclude_review(event, snapshot, vision_response)
+    
+    def _conclude_review(
+        self,
+        event: Dict,
+        snapshot: Optional[Union[Image.Image, bytes]],
+        vision_response: Optional[VisionModelResponse]
+    ) -> ReviewDecision:
+        """
+        Turn the fetched snapshot and vision analysis into a decision.
+        
+        Args:
+            event: Event dictionary from Frigate
+            snapshot: Snapshot for the event (None/empty if retrieval failed)
+            vision_response: Vision analysis (None if the model failed)
+            
+        Returns:
+            ReviewDecision (ERROR if either input is missing)
+        """
+        event_id = event.get('id')
+        original_label = event.get('label')
         
-        # Get snapshot
-        snapshot = self.frigate_client.get_snapshot(event_id, clean=True)
         if not snapshot:
-            logger.error(f"Failed to retrieve snapshot for event {event_id}")
+            logger.error("Failed to retrieve snapshot for event %s", event_id)
             return ReviewDecision(
                 decision=ReviewDecision.ERROR,
                 original_label=original_label,
                 notes="Failed to retrieve snapshot"
             )
         
-        # Analyze with vision model
-        vision_response = self.vision_client.analyze_image(snapshot, original_label)
         if not vision_response:
-            logger.error(f"Failed to get vision model response for event {event_id}")
+            logger.error("Failed to get vision model response for event %s", event_id)
             return ReviewDecision(
                 decision=ReviewDecision.ERROR,
                 original_label=original_label,
@@ -182,7 +402,7 @@ class EventReviewer:
         
         # Make decision
         decision = self.make_decision(vision_response, original_label)
-        logger.info(f"Decision for event {event_id}: {decision}")
+        logger.info("Decision for event %s: %s", event_id, decision)
         
         return decision
     
@@ -202,139 +422,299 @@ class EventReviewer:
             Submission result dictionary
         """
         event_id = event.get('id')
-        camera_name = event.get('camera')
         
         if self.dry_run:
-            logger.info(f"[DRY RUN] Would submit event {event_id}: {decision.decision}")
+            logger.info("[DRY RUN] Would submit event %s: %s", event_id, decision.decision)
             return {
                 'success': True,
                 'message': 'Dry run - no actual submission',
                 'dry_run': True
             }
         
-        # Determine submission parameters
-        if decision.decision == ReviewDecision.INVALID:
-            # Submit as invalid (false positive)
-            frame_time = self.frigate_client.get_snapshot_timestamp(event)
-            if not frame_time:
-                logger.error(f"Cannot submit invalid - no frame time for event {event_id}")
-                return {'success': False, 'error': 'No frame time'}
-            
-            return self.submitter.submit_invalid(camera_name, frame_time)
-        
-        elif decision.decision in [ReviewDecision.VALID, ReviewDecision.CORRECTED]:
-            # Determine label to submit
-            label = decision.corrected_label if decision.corrected_label else decision.original_label
-            
-            # Choose submission method
-            if self.submission_method == "event":
-                return self.submitter.submit_event(
-                    event_id=event_id,
-                    label=label,
-                    include_annotation=True
-                )
-            else:  # snapshot method (default/preferred)
-                frame_time = self.frigate_client.get_snapshot_timestamp(event)
-                if not frame_time:
-                    logger.error(f"Cannot submit snapshot - no frame time for event {event_id}")
-                    return {'success': False, 'error': 'No frame time'}
-                
-                return self.submitter.submit_snapshot(
-                    camera_name=camera_name,
-                    frame_time=frame_time,
-                    label=label,
-                    include_annotation=True
-                )
-        
-        else:
+        handler = self._submit_handlers.get(decision.decision)
+        if handler is None:
             # SKIPPED or ERROR - don't submit
-            logger.info(f"Not submitting event {event_id}: {decision.decision}")
+            logger.info("Not submitting event %s: %s", event_id, decision.decision)
             return {
                 'success': False,
                 'message': f'Not submitted: {decision.decision}'
             }
+        
+        return handler(event, decision)
+    
+    def _submit_invalid(self, event: Dict, decision: ReviewDecision) -> Dict:
+        """
+        Submit an event's snapshot as invalid (false positive).
+        
+        Args:
+            event: Event dictionary from Frigate
+            decision: Review decision (INVALID)
+            
+        Returns:
+            Submission result dictionary
+        """
+        frame_time = self.frigate_client.get_snapshot_timestamp(event)
+        if not frame_time:
+            logger.error("Cannot submit invalid - no frame time for event %s", event.get('id'))
+            return {'success': False, 'error': 'No frame time'}
+        
+        return self.submitter.submit_invalid(event.get('camera'), frame_time)
+    
+    def _submit_label(self, event: Dict, decision: ReviewDecision) -> Dict:
+        """
+        Submit an event with its confirmed or corrected label.
+        
+        Args:
+            event: Event dictionary from Frigate
+            decision: Review decision (VALID or CORRECTED)
+            
+        Returns:
+            Submission result dictionary
+        """
+        event_id = event.get('id')
+        
+        # Determine label to submit
+        label = decision.corrected_label if decision.corrected_label else decision.original_label
+        
+        # Choose submission method
+        if self.submission_method == "event":
+            return self.submitter.submit_event(
+                event_id=event_id,
+                label=label,
+                include_annotation=True
+            )
+        
+        # Snapshot method (default/preferred)
+        frame_time = self.frigate_client.get_snapshot_timestamp(event)
+        if not frame_time:
+            logger.error("Cannot submit snapshot - no frame time for event %s", event_id)
+            return {'success': False, 'error': 'No frame time'}
+        
+        return self.submitter.submit_snapshot(
+            camera_name=event.get('camera'),
+            frame_time=frame_time,
+            label=label,
+            include_annotation=True
+        )
     
-    def review_and_submit(self, event: Dict) -> bool:
+    def review_and_submit(
+        self,
+        event: Dict,
+        snapshot: Optional[Union[Image.Image, bytes]] = None,
+        vision_response: Optional[VisionModelResponse] = None
+    ) -> bool:
         """
         Review an event and submit the decision.
         
         Args:
             event: Event dictionary from Frigate
+            snapshot: Prefetched snapshot (fetched from Frigate if None)
+            vision_response: Precomputed vision analysis (analyzed here if None)
             
         Returns:
             True if successful, False otherwise
         """
         event_id = event.get('id')
-        camera_name = event.get('camera')
-        original_label = event.get('label')
         
         try:
             # Review the event
-            decision = self.review_event(event)
+            decision = self.review_event(event, snapshot, vision_response)
             if not decision:
-                logger.error(f"Failed to review event {event_id}")
+                logger.error("Failed to review event %s", event_id)
                 return False
             
-            # Submit the decision
-            submission_result = self.submit_decision(event, decision)
+            return self._submit_and_record(event, decision)
+            
+        except Exception as e:
+            logger.error("Error reviewing event %s: %s", event_id, e, exc_info=True)
+            return False
+    
+    def _submit_and_record(self, event: Dict, decision: ReviewDecision) -> bool:
+        """
+        Submit a decision, mark the event reviewed and record it as processed.
+        
+        Args:
+            event: Event dictionary from Frigate
+            decision: Review decision for the event
+            
+        Returns:
+            True if the submission succeeded, False otherwise
+        """
+        event_id = event.get('id')
+        
+        # Submit the decision
+        submission_result = self.submit_decision(event, decision)
+        
+        # Mark as reviewed in Frigate (only if successful and not dry-run)
+        if submission_result.get('success') and not submission_result.get('dry_run', False):
+            if self.mark_as_reviewed:
+                self.frigate_client.mark_event_reviewed(event_id, reviewed=True)
+        
+        # Mark as processed (only if not in dry-run mode)
+        if not submission_result.get('dry_run', False):
+            self.state_manager.mark_processed(
+                event_id=event_id,
+                camera_name=event.get('camera'),
+                label=event.get('label'),
+                decision=decision.decision,
+                corrected_label=decision.corrected_label,
+                submission_result=submission_result.get('success', False)
+            )
+        else:
+            logger.info("[DRY RUN] Not marking event %s as processed", event_id)
+        
+        return submission_result.get('success', False)
+    
+    async def review_and_submit_async(
+        self,
+        event: Dict,
+        snapshot: Optional[Union[Image.Image, bytes]] = None,
+        vision_response: Optional[VisionModelResponse] = None,
+        submit_slots: Optional[asyncio.Semaphore] = None,
+        prefetched: bool = False
+    ) -> bool:
+        """
+        Review an event and submit the decision without blocking the event loop.
+        
+        HTTP calls (snapshot fetch, submission) run on the event loop's default
+        thread pool and vision analysis on a dedicated pool, so one event's
+        submission overlaps with the next event's analysis.
+        
+        Args:
+            event: Event dictionary from Frigate
+            snapshot: Prefetched snapshot (fetched from Frigate if None)
+            vision_response: Precomputed vision analysis (analyzed here if None)
+            submit_slots: Semaphore held only while submitting (None = unlimited)
+            prefetched: Whether the snapshot was already fetched, in which
+                case None means that fetch failed and it isn't retried
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        event_id = event.get('id')
+        original_label = event.get('label')
+        
+        try:
+            logger.info("Reviewing event %s: %s/%s", event_id, event.get('camera'), original_label)
             
-            # Mark as reviewed in Frigate (only if successful and not dry-run)
-            if submission_result.get('success') and not submission_result.get('dry_run', False):
-                if self.mark_as_reviewed:
-                    self.frigate_client.mark_event_reviewed(event_id, reviewed=True)
+            if snapshot is None and not prefetched:
+                snapshot = await asyncio.to_thread(
+                    self.frigate_client.get_snapshot_bytes, event_id, True
+                )
             
-            # Mark as processed (only if not in dry-run mode)
-            if not submission_result.get('dry_run', False):
-                self.state_manager.mark_processed(
-                    event_id=event_id,
-                    camera_name=camera_name,
-                    label=original_label,
-                    decision=decision.decision,
-                    corrected_label=decision.corrected_label,
-                    submission_result=str(submission_result.get('success', False))
+            if snapshot and vision_response is None:
+                vision_response = await asyncio.get_running_loop().run_in_executor(
+                    self._vision_pool,
+                    self.analyze_snapshot,
+                    snapshot,
+                    original_label
                 )
-            else:
-                logger.info(f"[DRY RUN] Not marking event {event_id} as processed")
             
-            return submission_result.get('success', False)
+            decision = self._conclude_review(event, snapshot, vision_response)
+            async with submit_slots or contextlib.nullcontext():
+                return await asyncio.to_thread(self._submit_and_record, event, decision)
             
         except Exception as e:
-            logger.error(f"Error reviewing event {event_id}: {e}", exc_info=True)
+            logger.error("Error reviewing event %s: %s", event_id, e, exc_info=True)
             return False
     
-    def review_batch(self, events: List[Dict]) -> Dict[str, int]:
+    def review_batch(self, events: Iterable[Dict]) -> Dict[str, int]:
+        """
+        Review a batch of events.
+        
+        Args:
+            events: Event dictionaries (any iterable, consumed once)
+            
+        Returns:
+            Statistics dictionary
+        """
+        return asyncio.run(self.review_batch_async(events))
+    
+    async def review_batch_async(self, events: Iterable[Dict]) -> Dict[str, int]:
         """
         Review a batch of events.
         
+        Vision requests for all events are issued at once, limited only by
+        self.vision_concurrency; submissions run up to self.concurrency at a
+        time. Only events that still need review are held in memory.
+        
         Args:
-            events: List of event dictionaries
+            events: Event dictionaries (any iterable, consumed once)
             
         Returns:
             Statistics dictionary
         """
         stats = {
-            'total': len(events),
+            'total': 0,
             'success': 0,
             'failed': 0,
             'skipped': 0
         }
         
+        # Skip already processed events, and events that can't be reviewed,
+        # before any snapshot is downloaded for them
+        processed = self.state_manager.get_processed_event_ids()
+        pending = []
         for event in events:
-            event_id = event.get('id')
-            
-            # Check if already processed
-            if self.state_manager.is_processed(event_id):
-                logger.debug(f"Event {event_id} already processed, skipping")
+            stats['total'] += 1
+            if event.get('id') in processed:
                 stats['skipped'] += 1
                 continue
             
-            # Review and submit
-            success = self.review_and_submit(event)
+            reviewable, reason = self._is_reviewable(event)
+            if not reviewable:
+                logger.debug("Skipping event %s: %s", event.get('id'), reason)
+                stats['skipped'] += 1
+                continue
             
-            if success:
-                stats['success'] += 1
-            else:
-                stats['failed'] += 1
+            pending.append(event)
+        if stats['skipped']:
+            logger.debug("Skipping %s events", stats['skipped'])
+        
+        # Fetch all snapshots up front so downloads overlap
+        snapshots = await asyncio.to_thread(
+            self.frigate_client.get_snapshots_bulk,
+            [event.get('id') for event in pending],
+            True
+        )
         
-        logger.info(f"Batch review complete: {stats}")
+        # Optionally analyze the whole batch in one vision request; events
+        # missing from its answer (or all of them, if it fails) are analyzed
+        # individually below, and only there
+        vision_responses = {}
+        if self.batch_vision:
+            try:
+                vision_responses = await asyncio.to_thread(self.vision_client.analyze_combined, [
+                    (event.get('id'), snapshots[event.get('id')], event.get('label'))
+                    for event in pending
+                    if snapshots.get(event.get('id'))
+                ])
+            except Exception as e:
+                logger.error("Combined vision request failed: %s", e)
+        
+        # Review and submit
+        submit_slots = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*(
+            self.review_and_submit_async(
+                event,
+                snapshots.get(event.get('id')),
+                vision_responses.get(event.get('id')),
+                submit_slots,
+                prefetched=True
+            )
+            for event in pending
+        ))
+        stats['success'] = sum(1 for success in results if success)
+        stats['failed'] = len(results) - stats['success']
+        
+        # Persist the batch now rather than at the next debounced write
+        self.state_manager.flush()
+        
+        logger.info("Batch review complete: %s", stats)
         return stats
+    
+    def close(self) -> None:
+        """Stop the worker pools and close the Frigate and vision clients' connections."""
+        self._vision_pool.shutdown(wait=False)
+        self.vision_client.close()
+        self.frigate_client.close()
@@ -1,25 +1,62 @@
 """State Manager for tracking processed Frigate events."""
 
-import json
+import atexit
 import logging
 import os
+import threading
+import time
+import weakref
 from datetime import datetime
-from typing import Dict, Optional, Set
+from typing import Dict, Iterable, List, Optional, Set
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Processed events are appended to <state_file>.journal between full saves
+JOURNAL_SUFFIX = ".journal"
+
+# Minimum journal length before it is folded back into the state file
+COMPACT_MIN_LINES = 100
+
+# Journal appends are coalesced: buffered entries are written once this many
+# accumulate, or on the first mark after FLUSH_INTERVAL seconds
+FLUSH_EVERY = 25
+FLUSH_INTERVAL = 2.0
+
+
+def _flush_at_exit(ref: "weakref.ref[StateManager]") -> None:
+    """Flush a still-live StateManager when the interpreter exits."""
+    manager = ref()
+    if manager is not None:
+        manager.flush()
+
 
 class StateManager:
     """Manages state of processed events to prevent duplicates."""
     
-    def __init__(self, state_file: str = "state.json"):
+    def __init__(self, state_file: str = "state.json", durable: bool = False):
         """
         Initialize the state manager.
         
         Args:
             state_file: Path to the JSON state file
+            durable: If True, write and fsync every processed event immediately
+                instead of buffering, so nothing is lost on a crash or power cut
         """
         self.state_file = state_file
+        self.durable = durable
+        self.journal_file = state_file + JOURNAL_SUFFIX
+        self._journal_lines = 0
+        # Number of events in the state file as last loaded or saved
+        self._saved_count = 0
+        # Journal lines not yet written, and when the journal was last written
+        self._pending: List[bytes] = []
+        self._last_flush = float('-inf')
+        # Events are reviewed concurrently; serialize updates and saves
+        self._lock = threading.Lock()
+        # Membership index over state["processed_events"], kept in sync with it
+        self._processed_ids: Set[str] = set()
         self.state: Dict = {
             "processed_events": {},
             "metadata": {
@@ -28,20 +65,53 @@ class StateManager:
             }
         }
         self._load_state()
+        
+        # Don't lose buffered entries on a normal exit (held weakly, so
+        # discarded managers aren't kept alive just for this)
+        atexit.register(_flush_at_exit, weakref.ref(self))
     
     def _load_state(self) -> None:
         """Load state from disk if it exists."""
         if os.path.exists(self.state_file):
             try:
-                with open(self.state_file, 'r') as f:
-                    self.state = json.load(f)
-                logger.info(f"Loaded state from {self.state_file} with {len(self.state.get('processed_events', {}))} events")
-            except (json.JSONDecodeError, IOError) as e:
-                logger.error(f"Failed to load state file: {e}. Starting with empty state.")
+                with open(self.state_file, 'rb') as f:
+                    self.state = orjson.loads(f.read())
+                self._saved_count = len(self.state.get('processed_events', {}))
+                logger.info("Loaded state from %s with %s events",
+                            self.state_file, self._saved_count)
+            except (orjson.JSONDecodeError, IOError) as e:
+                logger.error("Failed to load state file: %s. Starting with empty state.", e)
                 self._initialize_empty_state()
         else:
-            logger.info(f"State file {self.state_file} does not exist. Starting fresh.")
+            logger.info("State file %s does not exist. Starting fresh.", self.state_file)
             self._initialize_empty_state()
+        
+        self._replay_journal()
+        self._processed_ids = set(self.state.get("processed_events", {}))
+    
+    def _replay_journal(self) -> None:
+        """Apply events journaled since the state file was last saved."""
+        if not os.path.exists(self.journal_file):
+            return
+        
+        events = self.state.setdefault("processed_events", {})
+        try:
+            with open(self.journal_file, 'rb') as f:
+                for line in f:
+                    try:
+                        record = orjson.loads(line)
+                        events[record.pop("event_id")] = record
+                    except (ValueError, KeyError, AttributeError):
+                        # Typically a line torn by a crash mid-write
+                        logger.warning("Skipping corrupt line in %s", self.journal_file)
+                        continue
+                    self._journal_lines += 1
+        except IOError as e:
+            logger.error("Failed to read state journal: %s", e)
+            return
+        
+        if self._journal_lines:
+            logger.info("Replayed %s events from %s", self._journal_lines, self.journal_file)
     
     def _initialize_empty_state(self) -> None:
         """Initialize an empty state structure."""
@@ -54,14 +124,59 @@ class StateManager:
         }
     
     def _save_state(self) -> None:
-        """Save state to disk."""
+        """
+        Save the full state to disk and empty the journal.
+        
+        The state file is replaced atomically, so a crash mid-save leaves the
+        previous state file (and the journal covering it) intact.
+        """
         try:
             self.state["metadata"]["last_updated"] = datetime.now().isoformat()
-            with open(self.state_file, 'w') as f:
-                json.dump(self.state, f, indent=2)
-            logger.debug(f"State saved to {self.state_file}")
+            tmp_file = self.state_file + ".tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(orjson.dumps(self.state, option=orjson.OPT_INDENT_2))
+                self._sync(f)
+            os.replace(tmp_file, self.state_file)
+            
+            # Everything journaled (or still buffered) is now in the state file
+            open(self.journal_file, 'w').close()
+            self._journal_lines = 0
+            self._saved_count = len(self.state["processed_events"])
+            self._pending.clear()
+            logger.debug("State saved to %s", self.state_file)
+        except IOError as e:
+            logger.error("Failed to save state: %s", e)
+    
+    def _flush_journal(self) -> None:
+        """Append all buffered entries to the journal in one write."""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        
+        try:
+            with open(self.journal_file, 'ab') as f:
+                f.write(b"".join(self._pending))
+                self._sync(f)
+            self._journal_lines += len(self._pending)
+            self._pending.clear()
         except IOError as e:
-            logger.error(f"Failed to save state: {e}")
+            logger.error("Failed to append to state journal: %s", e)
+    
+    def _sync(self, f) -> None:
+        """Force a just-written file to disk in durable mode."""
+        if self.durable:
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def flush(self) -> None:
+        """Write any buffered processed events to disk."""
+        with self._lock:
+            self._flush_journal()
+    
+    def compact(self) -> None:
+        """Fold the journal into the state file."""
+        with self._lock:
+            self._save_state()
     
     def is_processed(self, event_id: str) -> bool:
         """
@@ -73,7 +188,19 @@ class StateManager:
         Returns:
             True if event has been processed, False otherwise
         """
-        return event_id in self.state.get("processed_events", {})
+        return event_id in self._processed_ids
+    
+    def already_reviewed(self, event_ids: Iterable[str]) -> Set[str]:
+        """
+        Find which of the given events have already been processed.
+        
+        Args:
+            event_ids: Frigate event IDs to check
+            
+        Returns:
+            Set of the given IDs that have been processed
+        """
+        return self._processed_ids.intersection(event_ids)
     
     def mark_processed(
         self,
@@ -82,7 +209,7 @@ class StateManager:
         label: str,
         decision: str,
         corrected_label: Optional[str] = None,
-        submission_result: Optional[str] = None
+        submission_result: Optional[bool] = None
     ) -> None:
         """
         Mark an event as processed.
@@ -93,26 +220,42 @@ class StateManager:
             label: Original label from Frigate
             decision: Decision made (valid, invalid, corrected)
             corrected_label: Corrected label if different from original
-            submission_result: Result of Frigate+ submission
+            submission_result: Whether the Frigate+ submission succeeded
         """
-        self.state["processed_events"][event_id] = {
-            "timestamp": datetime.now().isoformat(),
+        record = {
+            "timestamp": time.time(),
             "camera_name": camera_name,
             "original_label": label,
             "decision": decision,
             "corrected_label": corrected_label,
             "submission_result": submission_result
         }
-        self._save_state()
-        logger.info(f"Marked event {event_id} as processed: {decision}")
+        
+        with self._lock:
+            events = self.state["processed_events"]
+            events[event_id] = record
+            self._processed_ids.add(event_id)
+            
+            # Append one line instead of rewriting the whole file
+            self._pending.append(orjson.dumps({"event_id": event_id, **record}) + b"\n")
+            if (self.durable
+                    or len(self._pending) >= FLUSH_EVERY
+                    or time.monotonic() - self._last_flush >= FLUSH_INTERVAL):
+                self._flush_journal()
+            
+            # Compact once the journal outgrows the state file it extends, so
+            # each save is paid for by at least as many cheap appends
+            if self._journal_lines + len(self._pending) >= max(COMPACT_MIN_LINES, self._saved_count):
+                self._save_state()
+        logger.info("Marked event %s as processed: %s", event_id, decision)
     
     def get_processed_count(self) -> int:
         """Get the total number of processed events."""
         return len(self.state.get("processed_events", {}))
     
     def get_processed_event_ids(self) -> Set[str]:
-        """Get a set of all processed event IDs."""
-        return set(self.state.get("processed_events", {}).keys())
+        """Get the set of all processed event IDs (shared; do not modify)."""
+        return self._processed_ids
     
     def cleanup_old_entries(self, days: int = 30) -> int:
         """
@@ -124,28 +267,33 @@ class StateManager:
         Returns:
             Number of entries removed
         """
-        from datetime import timedelta
-        
-        cutoff_date = datetime.now() - timedelta(days=days)
-        events = self.state.get("processed_events", {})
-        initial_count = len(events)
-        
-        events_to_remove = []
-        for event_id, data in events.items():
-            try:
-                event_time = datetime.fromisoformat(data["timestamp"])
-                if event_time < cutoff_date:
-                    events_to_remove.append(event_id)
-            except (KeyError, ValueError):
-                # If timestamp is missing or invalid, keep the entry
-                continue
+        cutoff = time.time() - days * 86400
         
-        for event_id in events_to_remove:
-            del events[event_id]
+        with self._lock:
+            events = self.state.get("processed_events", {})
+            
+            events_to_remove = []
+            for event_id, data in events.items():
+                try:
+                    event_time = data["timestamp"]
+                    # Entries written before epoch timestamps use ISO strings
+                    if isinstance(event_time, str):
+                        event_time = datetime.fromisoformat(event_time).timestamp()
+                    if event_time < cutoff:
+                        events_to_remove.append(event_id)
+                except (KeyError, TypeError, ValueError):
+                    # If timestamp is missing or invalid, keep the entry
+                    continue
+            
+            for event_id in events_to_remove:
+                del events[event_id]
+                self._processed_ids.discard(event_id)
+            
+            removed_count = len(events_to_remove)
+            if removed_count > 0:
+                self._save_state()
         
-        removed_count = initial_count - len(events)
         if removed_count > 0:
-            self._save_state()
-            logger.info(f"Cleaned up {removed_count} old entries from state")
+            logger.info("Cleaned up %s old entries from state", removed_count)
         
         return removed_count
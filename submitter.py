@@ -4,12 +4,21 @@ import logging
 from typing import Dict, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
 
 class FrigatePlusSubmitter:
-    """Client for submitting to Frigate+ API."""
+    """
+    Client for submitting to Frigate+ API.
+    
+    Every submission is its own POST: Frigate only exposes per-snapshot and
+    per-event Frigate+ endpoints, with no bulk variant to batch them into.
+    Throughput instead comes from submitting several events concurrently
+    (see EventReviewer.review_batch) over the session's pooled connections.
+    """
     
     def __init__(self, base_url: str, plus_api_key: str, timeout: int = 30):
         """
@@ -24,6 +33,27 @@ class FrigatePlusSubmitter:
         self.plus_api_key = plus_api_key
         self.timeout = timeout
         self.session = requests.Session()
+        self.session.headers['X-Frigate-Plus-Key'] = plus_api_key
+        
+        # Keep-alive pool large enough for concurrent submissions. POSTs are
+        # only retried when the server explicitly refused them (429/503, after
+        # any Retry-After delay) or never received them (connect errors), so
+        # a retry can't duplicate a submission that was already accepted.
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                read=0,
+                backoff_factor=0.2,
+                status_forcelist=[429, 503],
+                allowed_methods=None,
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
     
     def submit_snapshot(
         self,
@@ -56,18 +86,12 @@ class FrigatePlusSubmitter:
                 'include_annotation': include_annotation
             }
             
-            # Add Frigate+ API key header
-            headers = {
-                'X-Frigate-Plus-Key': self.plus_api_key
-            }
-            
-            logger.info(f"Submitting snapshot to Frigate+: camera={camera_name}, "
-                       f"time={frame_time}, label={label}")
+            logger.info("Submitting snapshot to Frigate+: camera=%s, time=%s, label=%s",
+                        camera_name, frame_time, label)
             
             response = self.session.post(
                 endpoint,
                 json=payload,
-                headers=headers,
                 timeout=self.timeout
             )
             
@@ -85,7 +109,7 @@ class FrigatePlusSubmitter:
             except:
                 result['response_data'] = response.text
             
-            logger.info(f"Successfully submitted snapshot for {camera_name}")
+            logger.info("Successfully submitted snapshot for %s", camera_name)
             return result
             
         except requests.HTTPError as e:
@@ -96,7 +120,7 @@ class FrigatePlusSubmitter:
             try:
                 if e.response and e.response.text:
                     error_detail = e.response.text
-                    logger.error(f"{error_msg} - Response: {error_detail}")
+                    logger.error("%s - Response: %s", error_msg, error_detail)
                 else:
                     logger.error(error_msg)
             except:
@@ -155,17 +179,11 @@ class FrigatePlusSubmitter:
                 'include_annotation': include_annotation
             }
             
-            # Add Frigate+ API key header
-            headers = {
-                'X-Frigate-Plus-Key': self.plus_api_key
-            }
-            
-            logger.info(f"Submitting event to Frigate+: event_id={event_id}, label={label}")
+            logger.info("Submitting event to Frigate+: event_id=%s, label=%s", event_id, label)
             
             response = self.session.post(
                 endpoint,
                 json=payload,
-                headers=headers,
                 timeout=self.timeout
             )
             
@@ -183,7 +201,7 @@ class FrigatePlusSubmitter:
             except:
                 result['response_data'] = response.text
             
-            logger.info(f"Successfully submitted event {event_id}")
+            logger.info("Successfully submitted event %s", event_id)
             return result
             
         except requests.HTTPError as e:
@@ -194,7 +212,7 @@ class FrigatePlusSubmitter:
             try:
                 if e.response and e.response.text:
                     error_detail = e.response.text
-                    logger.error(f"{error_msg} - Response: {error_detail}")
+                    logger.error("%s - Response: %s", error_msg, error_detail)
                 else:
                     logger.error(error_msg)
             except:
@@ -0,0 +1,75 @@
+"""Unit tests for configuration parsing."""
+
+import unittest
+
+import msgspec
+
+from config import parse_config
+
+
+class TestParseConfig(unittest.TestCase):
+    """Test cases for the typed configuration schema."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.raw = {
+            'frigate': {
+                'base_url': 'http://localhost:5000',
+                'plus_api_key': 'plus-key'
+            },
+            'vision_model': {
+                'provider': 'gemini',
+                'api_key': 'vision-key',
+                'model_name': 'gemini-2.0-flash-exp'
+            },
+            'review_rules': {
+                'allowed_labels': ['person', 'car']
+            },
+            'processing': {}
+        }
+    
+    def test_defaults(self):
+        """Test optional settings fall back to their defaults."""
+        config = parse_config(self.raw)
+        
+        self.assertEqual(config.frigate.poll_interval_seconds, 60)
+        self.assertEqual(config.frigate.daemon_mode, 'poll')
+        self.assertEqual(config.vision_model.timeout_seconds, 30)
+        self.assertIsNone(config.review_rules.min_confidence)
+        self.assertEqual(config.review_rules.allowed_labels, ['person', 'car'])
+        self.assertEqual(config.processing.max_events_per_run, 20)
+        self.assertEqual(config.processing.submission_method, 'snapshot')
+        self.assertEqual(config.logging.level, 'INFO')
+        self.assertIsNone(config.mqtt)
+    
+    def test_missing_section(self):
+        """Test a missing required section is rejected."""
+        del self.raw['vision_model']
+        
+        with self.assertRaises(msgspec.ValidationError):
+            parse_config(self.raw)
+    
+    def test_empty_required_value(self):
+        """Test an empty required value is rejected."""
+        self.raw['frigate']['plus_api_key'] = ''
+        
+        with self.assertRaises(msgspec.ValidationError):
+            parse_config(self.raw)
+    
+    def test_invalid_submission_method(self):
+        """Test an unknown submission method is rejected."""
+        self.raw['processing']['submission_method'] = 'email'
+        
+        with self.assertRaises(msgspec.ValidationError):
+            parse_config(self.raw)
+    
+    def test_zero_poll_interval(self):
+        """Test a poll interval below one second is rejected."""
+        self.raw['frigate']['poll_interval_seconds'] = 0
+        
+        with self.assertRaises(msgspec.ValidationError):
+            parse_config(self.raw)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""Unit tests for FrigateEventListener."""
+
+import json
+import unittest
+from unittest.mock import Mock
+
+from event_listener import FrigateEventListener
+
+
+class TestFrigateEventListener(unittest.TestCase):
+    """Test cases for MQTT event handling."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.listener = FrigateEventListener(host='localhost')
+    
+    def _publish(self, event_type, event_id):
+        """Deliver a Frigate event message to the listener."""
+        payload = json.dumps({
+            'type': event_type,
+            'before': {'id': event_id},
+            'after': {'id': event_id, 'label': 'person'}
+        }).encode()
+        self.listener._on_message(None, None, Mock(payload=payload))
+    
+    def test_topic_prefix(self):
+        """Test the events topic is derived from the prefix."""
+        listener = FrigateEventListener(host='localhost', topic_prefix='cams/')
+        
+        self.assertEqual(listener.topic, 'cams/events')
+    
+    def test_only_end_events_queued(self):
+        """Test that only finished events are queued."""
+        self._publish('new', 'event-1')
+        self._publish('update', 'event-1')
+        self._publish('end', 'event-1')
+        self._publish('end', 'event-2')
+        
+        event_ids = self.listener.wait_for_events(timeout=0.1, batch_window=0.01)
+        
+        self.assertEqual(event_ids, ['event-1', 'event-2'])
+    
+    def test_duplicate_events_collapsed(self):
+        """Test repeated end messages for an event yield one ID."""
+        self._publish('end', 'event-1')
+        self._publish('end', 'event-1')
+        
+        event_ids = self.listener.wait_for_events(timeout=0.1, batch_window=0.01)
+        
+        self.assertEqual(event_ids, ['event-1'])
+    
+    def test_wake_returns_early(self):
+        """Test wake() unblocks a waiting caller without yielding an ID."""
+        self.listener.wake()
+        
+        self.assertEqual(self.listener.wait_for_events(timeout=5, batch_window=0.01), [])
+    
+    def test_request_resync(self):
+        """Test a requested resync is reported once."""
+        self.listener.request_resync()
+        
+        self.assertTrue(self.listener.needs_resync())
+        self.assertFalse(self.listener.needs_resync())
+    
+    def test_invalid_payload_ignored(self):
+        """Test malformed messages don't break the listener."""
+        self.listener._on_message(None, None, Mock(payload=b'not json'))
+        
+        self.assertEqual(self.listener.wait_for_events(timeout=0.01), [])
+
+    
+    def test_malformed_event_structure_ignored(self):
+        """Test well-formed JSON with an unexpected shape is skipped."""
+        for payload in (b'[1, 2]', b'"end"', b'{"type": "end", "after": null}', b'{"type": "end", "after": [1]}'):
+            self.listener._on_message(None, None, Mock(payload=payload))
+        
+        self.assertEqual(self.listener.wait_for_events(timeout=0.01), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,18 +1,26 @@
 """Unit tests for FrigateClient event filtering."""
 
+import importlib.util
 import unittest
-from frigate_client import FrigateClient
+from io import BytesIO
+from unittest.mock import MagicMock, Mock, patch
+
+import requests
+from PIL import Image
+
+from frigate_client import FrigateClient, decode_snapshot
 
 
 class TestFrigateClientFiltering(unittest.TestCase):
     """Test cases for event filtering logic."""
     
-    def setUp(self):
-        """Set up test fixtures."""
-        self.client = FrigateClient(base_url='http://localhost:5000')
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures shared by all tests (read-only)."""
+        cls.client = FrigateClient(base_url='http://localhost:5000')
         
         # Sample events for testing
-        self.events = [
+        cls.events = (
             {
                 'id': 'event-1',
                 'camera': 'front_door',
@@ -48,7 +56,7 @@ class TestFrigateClientFiltering(unittest.TestCase):
                 'has_snapshot': True,
                 'data': {'score': 0.6}
             }
-        ]
+        )
     
     def test_filter_no_snapshot(self):
         """Test filtering events without snapshots."""
@@ -116,6 +124,17 @@ class TestFrigateClientFiltering(unittest.TestCase):
         cameras = [e['camera'] for e in filtered]
         self.assertNotIn('backyard', cameras)
     
+    def test_compile_filter(self):
+        """Test a compiled predicate applies the rules to single events."""
+        event_filter = self.client.compile_filter(
+            min_confidence=0.5,
+            include_cameras=['front_door', 'driveway']
+        )
+        
+        kept = [e['id'] for e in self.events if event_filter(e)]
+        
+        self.assertEqual(kept, ['event-1', 'event-2'])
+    
     def test_filter_combined(self):
         """Test combined filtering rules."""
         filtered = self.client.filter_events(
@@ -133,5 +152,140 @@ class TestFrigateClientFiltering(unittest.TestCase):
         self.assertIn('event-2', event_ids)
 
 
+class TestFrigateClientEvents(unittest.TestCase):
+    """Test cases for event retrieval."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.client = FrigateClient(base_url='http://localhost:5000')
+    
+    def test_get_events_parses_response(self):
+        """Test events are parsed from the raw response body."""
+        response = Mock(content=b'[{"id": "event-1", "label": "person"}]')
+        
+        with patch.object(self.client.session, 'get', return_value=response):
+            events = self.client.get_events()
+        
+        self.assertEqual(events, [{'id': 'event-1', 'label': 'person'}])
+    
+    @unittest.skipIf(importlib.util.find_spec('ijson') is None, "ijson not installed")
+    def test_get_events_streamed_filter(self):
+        """Test events are filtered while a streamed response is parsed."""
+        body = b'[{"id": "event-1", "label": "person"}, {"id": "event-2", "label": "car"}]'
+        response = MagicMock(raw=BytesIO(body))
+        response.__enter__.return_value = response
+        
+        with patch.object(self.client.session, 'get', return_value=response) as mock_get:
+            events = self.client.get_events(event_filter=lambda e: e['label'] == 'car')
+        
+        self.assertEqual(events, [{'id': 'event-2', 'label': 'car'}])
+        self.assertTrue(mock_get.call_args.kwargs['stream'])
+    
+    def test_get_events_filter_without_ijson(self):
+        """Test the event filter is applied when ijson isn't installed."""
+        response = Mock(content=b'[{"id": "event-1", "label": "person"}, {"id": "event-2", "label": "car"}]')
+        
+        with patch('frigate_client.ijson', None), \
+                patch.object(self.client.session, 'get', return_value=response):
+            events = self.client.get_events(event_filter=lambda e: e['label'] == 'car')
+        
+        self.assertEqual(events, [{'id': 'event-2', 'label': 'car'}])
+    
+    def test_test_connection_cached(self):
+        """Test a recent successful connection check is not repeated."""
+        with patch.object(self.client.session, 'get', return_value=Mock()) as mock_get:
+            self.assertTrue(self.client.test_connection())
+            self.assertTrue(self.client.test_connection())
+        
+        self.assertEqual(mock_get.call_count, 1)
+    
+    def test_test_connection_after_failed_fetch(self):
+        """Test a failed event fetch forces the next connection check."""
+        with patch.object(self.client.session, 'get', return_value=Mock()) as mock_get:
+            self.client.test_connection()
+            mock_get.side_effect = requests.ConnectionError('down')
+            self.client.get_events()
+            self.assertFalse(self.client.test_connection())
+        
+        self.assertEqual(mock_get.call_count, 3)
+    
+    def test_get_events_invalid_json(self):
+        """Test invalid JSON returns an empty list."""
+        response = Mock(content=b'<html>Bad Gateway</html>')
+        
+        with patch.object(self.client.session, 'get', return_value=response):
+            events = self.client.get_events()
+        
+        self.assertEqual(events, [])
+
+
+class TestFrigateClientSnapshots(unittest.TestCase):
+    """Test cases for snapshot retrieval."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.client = FrigateClient(base_url='http://localhost:5000')
+    
+    def test_get_snapshots_bulk(self):
+        """Test bulk snapshot fetch keeps order and maps failures to None."""
+        snapshots = {'event-1': b'one', 'event-2': None, 'event-3': b'three'}
+        
+        with patch.object(self.client, 'get_snapshot_bytes',
+                          side_effect=lambda event_id, clean: snapshots[event_id]):
+            result = self.client.get_snapshots_bulk(['event-1', 'event-2', 'event-3'])
+        
+        self.assertEqual(list(result), ['event-1', 'event-2', 'event-3'])
+        self.assertEqual(result, snapshots)
+    
+    def test_get_snapshots_bulk_empty(self):
+        """Test bulk snapshot fetch with no events."""
+        self.assertEqual(self.client.get_snapshots_bulk([]), {})
+    
+    def test_close_stops_download_pool(self):
+        """Test close() shuts down the download workers and the session."""
+        with patch.object(self.client, 'get_snapshot_bytes', return_value=b'one'):
+            self.client.get_snapshots_bulk(['event-1', 'event-2'])
+        executor = self.client._executor
+        
+        with patch.object(self.client.session, 'close') as close_session:
+            self.client.close()
+        
+        self.assertIsNone(self.client._executor)
+        self.assertTrue(executor._shutdown)
+        close_session.assert_called_once_with()
+    
+    def test_get_snapshot_timestamp(self):
+        """Test snapshot frame time is preferred over the event start time."""
+        event = {'id': 'event-1', 'start_time': 100.0, 'snapshot': {'frame_time': 105.5}}
+        
+        self.assertEqual(self.client.get_snapshot_timestamp(event), 105.5)
+    
+    def test_get_snapshot_timestamp_fallback(self):
+        """Test falling back to start time when snapshot metadata is missing."""
+        self.assertEqual(
+            self.client.get_snapshot_timestamp({'id': 'event-1', 'start_time': 100.0, 'snapshot': None}),
+            100.0
+        )
+        self.assertIsNone(self.client.get_snapshot_timestamp({'id': 'event-1'}))
+    
+    def test_decode_snapshot(self):
+        """Test decoding snapshot bytes into an image."""
+        buffer = BytesIO()
+        Image.new('RGB', (64, 48)).save(buffer, format='JPEG')
+        
+        image = decode_snapshot(buffer.getvalue())
+        
+        self.assertEqual(image.size, (64, 48))
+    
+    def test_decode_snapshot_target_size(self):
+        """Test decoding downscales to fit the target size."""
+        buffer = BytesIO()
+        Image.new('RGB', (1920, 1080)).save(buffer, format='JPEG')
+        
+        image = decode_snapshot(buffer.getvalue(), target_size=(512, 512))
+        
+        self.assertEqual(image.size, (512, 288))
+
+
 if __name__ == '__main__':
     unittest.main()
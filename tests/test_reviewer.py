@@ -1,12 +1,24 @@
 """Unit tests for EventReviewer decision logic."""
 
+import threading
 import unittest
+from io import BytesIO
 from unittest.mock import Mock
 
-from reviewer import ReviewDecision, EventReviewer
+from PIL import Image
+
+from reviewer import ReviewDecision, EventReviewer, snapshot_dhash
 from vision_client import VisionModelResponse
 
 
+def _gradient_jpeg(reverse: bool = False) -> bytes:
+    """Encode a horizontal gradient as JPEG bytes."""
+    image = Image.linear_gradient('L').rotate(90 if reverse else -90).convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
 class TestReviewDecision(unittest.TestCase):
     """Test cases for ReviewDecision."""
     
@@ -21,6 +33,12 @@ class TestReviewDecision(unittest.TestCase):
         self.assertEqual(decision.decision, ReviewDecision.VALID)
         self.assertEqual(decision.original_label, 'person')
         self.assertEqual(decision.confidence, 0.9)
+    
+    def test_decision_has_no_instance_dict(self):
+        """Test ReviewDecision instances use slots."""
+        decision = ReviewDecision(decision=ReviewDecision.VALID, original_label='person')
+        
+        self.assertFalse(hasattr(decision, '__dict__'))
 
 
 class TestEventReviewerDecisionLogic(unittest.TestCase):
@@ -105,6 +123,192 @@ class TestEventReviewerDecisionLogic(unittest.TestCase):
         decision = self.reviewer.make_decision(vision_response, 'person')
         
         self.assertEqual(decision.decision, ReviewDecision.VALID)
+    
+    def test_submit_corrected_snapshot(self):
+        """Test a corrected decision submits the snapshot with the new label."""
+        self.frigate_client.get_snapshot_timestamp.return_value = 1700000000.5
+        decision = ReviewDecision(
+            decision=ReviewDecision.CORRECTED,
+            original_label='dog',
+            corrected_label='cat'
+        )
+        
+        self.reviewer.submit_decision({'id': 'event-1', 'camera': 'yard'}, decision)
+        
+        self.submitter.submit_snapshot.assert_called_once_with(
+            camera_name='yard',
+            frame_time=1700000000.5,
+            label='cat',
+            include_annotation=True
+        )
+    
+    def test_submit_invalid(self):
+        """Test an invalid decision submits the snapshot as a false positive."""
+        self.frigate_client.get_snapshot_timestamp.return_value = 1700000000.5
+        decision = ReviewDecision(decision=ReviewDecision.INVALID, original_label='person')
+        
+        self.reviewer.submit_decision({'id': 'event-1', 'camera': 'yard'}, decision)
+        
+        self.submitter.submit_invalid.assert_called_once_with('yard', 1700000000.5)
+    
+    def test_skipped_not_submitted(self):
+        """Test a skipped decision isn't submitted."""
+        decision = ReviewDecision(decision=ReviewDecision.SKIPPED, original_label='person')
+        
+        result = self.reviewer.submit_decision({'id': 'event-1', 'camera': 'yard'}, decision)
+        
+        self.assertFalse(result['success'])
+        self.submitter.submit_snapshot.assert_not_called()
+        self.submitter.submit_invalid.assert_not_called()
+
+
+class TestEventReviewerBatch(unittest.TestCase):
+    """Test cases for concurrent batch review."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.frigate_client = Mock()
+        self.frigate_client.get_snapshots_bulk.side_effect = (
+            lambda event_ids, clean: {event_id: b'jpeg' for event_id in event_ids}
+        )
+        self.state_manager = Mock()
+        self.state_manager.get_processed_event_ids.return_value = {'event-1'}
+        
+        self.vision_client = Mock()
+        self.vision_client.analyze_image.return_value = VisionModelResponse(
+            object_present=True,
+            correct_label='person',
+            confidence=0.9
+        )
+        
+        self.reviewer = EventReviewer(
+            frigate_client=self.frigate_client,
+            vision_client=self.vision_client,
+            submitter=Mock(),
+            state_manager=self.state_manager,
+            concurrency=2
+        )
+    
+    def test_review_batch_stats(self):
+        """Test processed events are skipped and results are counted."""
+        events = ({'id': f'event-{i}', 'label': 'person', 'has_snapshot': True} for i in range(1, 6))
+        self.reviewer._submit_and_record = Mock(side_effect=lambda event, decision: event['id'] != 'event-3')
+        
+        stats = self.reviewer.review_batch(events)
+        
+        self.assertEqual(stats, {'total': 5, 'success': 3, 'failed': 1, 'skipped': 1})
+        self.assertEqual(self.vision_client.analyze_image.call_count, 4)
+        self.vision_client.analyze_image.assert_any_call(b'jpeg', 'person')
+        
+        decision = self.reviewer._submit_and_record.call_args.args[1]
+        self.assertEqual(decision.decision, ReviewDecision.VALID)
+    
+    def test_review_batch_skips_unreviewable(self):
+        """Test events without a snapshot are skipped before any download."""
+        events = [
+            {'id': 'event-2', 'label': 'person', 'has_snapshot': False},
+            {'id': 'event-3', 'label': 'person', 'has_snapshot': True, 'data': {'score': 0}}
+        ]
+        self.reviewer._submit_and_record = Mock()
+        
+        stats = self.reviewer.review_batch(events)
+        
+        self.assertEqual(stats['skipped'], 2)
+        self.frigate_client.get_snapshots_bulk.assert_called_once_with([], True)
+        self.reviewer._submit_and_record.assert_not_called()
+    
+    def test_vision_requests_not_limited_by_review_concurrency(self):
+        """Test vision calls for a batch overlap beyond the submission limit."""
+        reviewer = EventReviewer(
+            frigate_client=self.frigate_client,
+            vision_client=self.vision_client,
+            submitter=Mock(),
+            state_manager=self.state_manager,
+            concurrency=1,
+            vision_concurrency=3
+        )
+        reviewer._submit_and_record = Mock(return_value=True)
+        # Every call waits for the other two, so this only passes if all three overlap
+        barrier = threading.Barrier(3, timeout=5)
+        response = self.vision_client.analyze_image.return_value
+        
+        def analyze_image(snapshot, label):
+            barrier.wait()
+            return response
+        
+        self.vision_client.analyze_image.side_effect = analyze_image
+        events = [{'id': f'event-{i}', 'label': 'person', 'has_snapshot': True} for i in range(2, 5)]
+        
+        stats = reviewer.review_batch(events)
+        
+        self.assertEqual(stats['success'], 3)
+    
+    def test_failed_prefetch_not_retried(self):
+        """Test a snapshot the bulk prefetch couldn't download isn't fetched again."""
+        self.frigate_client.get_snapshots_bulk.side_effect = (
+            lambda event_ids, clean: {event_id: None for event_id in event_ids}
+        )
+        self.reviewer._submit_and_record = Mock(return_value=False)
+        
+        stats = self.reviewer.review_batch([{'id': 'event-2', 'label': 'person', 'has_snapshot': True}])
+        
+        self.assertEqual(stats['failed'], 1)
+        self.frigate_client.get_snapshot_bytes.assert_not_called()
+        self.vision_client.analyze_image.assert_not_called()
+        decision = self.reviewer._submit_and_record.call_args.args[1]
+        self.assertEqual(decision.decision, ReviewDecision.ERROR)
+    
+    def test_failed_combined_request_analyzes_each_event_once(self):
+        """Test events are analyzed exactly once when the combined request fails."""
+        self.reviewer.batch_vision = True
+        self.vision_client.analyze_combined.return_value = {}
+        self.reviewer._submit_and_record = Mock(return_value=True)
+        events = [{'id': f'event-{i}', 'label': 'person', 'has_snapshot': True} for i in range(2, 6)]
+        
+        stats = self.reviewer.review_batch(events)
+        
+        self.assertEqual(stats['success'], 4)
+        self.vision_client.analyze_combined.assert_called_once()
+        self.assertEqual(self.vision_client.analyze_image.call_count, 4)
+    
+    def test_close_closes_vision_client(self):
+        """Test closing the reviewer releases the vision and Frigate clients."""
+        self.reviewer.close()
+        
+        self.vision_client.close.assert_called_once_with()
+        self.frigate_client.close.assert_called_once_with()
+    
+    def test_near_duplicate_snapshot_reuses_analysis(self):
+        """Test the vision model isn't called again for a near-identical snapshot."""
+        self.reviewer.dedupe_distance = 4
+        snapshot = _gradient_jpeg()
+        self.reviewer.analyze_snapshot(snapshot, 'person')
+        
+        for label, expected_calls in (('person', 1), ('car', 2)):
+            with self.subTest(label=label):
+                self.reviewer.analyze_snapshot(snapshot, label)
+                
+                self.assertEqual(self.vision_client.analyze_image.call_count, expected_calls)
+
+
+class TestSnapshotDhash(unittest.TestCase):
+    """Test cases for snapshot fingerprinting."""
+    
+    def test_similar_snapshots(self):
+        """Test a re-encoded snapshot hashes close to the original."""
+        original = _gradient_jpeg()
+        reencoded = BytesIO()
+        Image.open(BytesIO(original)).save(reencoded, format='JPEG', quality=50)
+        
+        distance = (snapshot_dhash(original) ^ snapshot_dhash(reencoded.getvalue())).bit_count()
+        
+        self.assertLessEqual(distance, 4)
+    
+    def test_different_snapshots(self):
+        """Test unrelated snapshots hash far apart."""
+        distance = (snapshot_dhash(_gradient_jpeg()) ^ snapshot_dhash(_gradient_jpeg(reverse=True))).bit_count()
+        
+        self.assertGreater(distance, 32)
 
 
 if __name__ == '__main__':
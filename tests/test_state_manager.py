@@ -5,8 +5,9 @@ import os
 import tempfile
 import unittest
 from datetime import datetime, timedelta
+from unittest.mock import Mock
 
-from state_manager import StateManager
+from state_manager import COMPACT_MIN_LINES, JOURNAL_SUFFIX, StateManager
 
 
 class TestStateManager(unittest.TestCase):
@@ -21,8 +22,9 @@ class TestStateManager(unittest.TestCase):
     
     def tearDown(self):
         """Clean up test fixtures."""
-        if os.path.exists(self.state_file):
-            os.unlink(self.state_file)
+        for path in (self.state_file, self.state_file + JOURNAL_SUFFIX):
+            if os.path.exists(path):
+                os.unlink(path)
     
     def test_initialize_empty_state(self):
         """Test initialization with no existing state file."""
@@ -68,6 +70,68 @@ class TestStateManager(unittest.TestCase):
         self.assertTrue(manager2.is_processed('persistent-event'))
         self.assertEqual(manager2.get_processed_count(), 1)
     
+    def test_journal_compaction(self):
+        """Test the journal is folded into the state file once it grows."""
+        manager = StateManager(self.state_file)
+        
+        for i in range(COMPACT_MIN_LINES):
+            manager.mark_processed(f'event-{i}', 'camera', 'person', 'valid')
+        
+        self.assertEqual(os.path.getsize(self.state_file + JOURNAL_SUFFIX), 0)
+        with open(self.state_file) as f:
+            self.assertEqual(len(json.load(f)['processed_events']), COMPACT_MIN_LINES)
+    
+    def test_journal_compacted_repeatedly(self):
+        """Test the journal keeps being folded as the state grows."""
+        manager = StateManager(self.state_file)
+        journal_file = self.state_file + JOURNAL_SUFFIX
+        manager._save_state = Mock(wraps=manager._save_state)
+        
+        for i in range(3 * COMPACT_MIN_LINES):
+            manager.mark_processed(f'event-{i}', 'camera', 'person', 'valid')
+        
+        self.assertGreater(manager._save_state.call_count, 1)
+        with open(journal_file) as f:
+            self.assertLess(len(f.readlines()), 2 * COMPACT_MIN_LINES)
+    
+    def test_journal_writes_coalesced(self):
+        """Test marks in quick succession are buffered until flushed."""
+        manager = StateManager(self.state_file)
+        journal_file = self.state_file + JOURNAL_SUFFIX
+        
+        for i in range(3):
+            manager.mark_processed(f'event-{i}', 'camera', 'person', 'valid')
+        
+        with open(journal_file) as f:
+            self.assertEqual(len(f.readlines()), 1)
+        
+        manager.flush()
+        
+        with open(journal_file) as f:
+            self.assertEqual(len(f.readlines()), 3)
+    
+    def test_durable_writes_not_buffered(self):
+        """Test durable mode writes every mark to the journal immediately."""
+        manager = StateManager(self.state_file, durable=True)
+        
+        for i in range(3):
+            manager.mark_processed(f'event-{i}', 'camera', 'person', 'valid')
+        
+        with open(self.state_file + JOURNAL_SUFFIX) as f:
+            self.assertEqual(len(f.readlines()), 3)
+    
+    def test_corrupt_journal_line_skipped(self):
+        """Test a torn journal line doesn't discard the other entries."""
+        manager1 = StateManager(self.state_file)
+        manager1.mark_processed('event-1', 'camera', 'person', 'valid')
+        with open(self.state_file + JOURNAL_SUFFIX, 'a') as f:
+            f.write('{"event_id": "event-2", "came')
+        
+        manager2 = StateManager(self.state_file)
+        
+        self.assertTrue(manager2.is_processed('event-1'))
+        self.assertFalse(manager2.is_processed('event-2'))
+    
     def test_multiple_events(self):
         """Test processing multiple events."""
         manager = StateManager(self.state_file)
@@ -101,6 +165,17 @@ class TestStateManager(unittest.TestCase):
         for event_id in event_ids:
             self.assertIn(event_id, processed_ids)
     
+    def test_already_reviewed(self):
+        """Test bulk lookup of processed event IDs."""
+        manager = StateManager(self.state_file)
+        
+        manager.mark_processed('event-1', 'camera', 'person', 'valid')
+        manager.mark_processed('event-2', 'camera', 'car', 'valid')
+        
+        seen = manager.already_reviewed(['event-1', 'event-3', 'event-2'])
+        
+        self.assertEqual(seen, {'event-1', 'event-2'})
+    
     def test_cleanup_old_entries(self):
         """Test cleanup of old state entries."""
         manager = StateManager(self.state_file)
@@ -124,6 +199,20 @@ class TestStateManager(unittest.TestCase):
         self.assertEqual(removed, 1)
         self.assertTrue(manager.is_processed('recent-event'))
         self.assertFalse(manager.is_processed('old-event'))
+    
+    def test_cleanup_epoch_timestamps(self):
+        """Test cleanup of entries stored with epoch timestamps."""
+        manager = StateManager(self.state_file)
+        
+        manager.mark_processed('recent-event', 'camera', 'person', 'valid')
+        manager.mark_processed('old-event', 'camera', 'car', 'valid')
+        manager.state['processed_events']['old-event']['timestamp'] -= 40 * 86400
+        
+        removed = manager.cleanup_old_entries(days=30)
+        
+        self.assertEqual(removed, 1)
+        self.assertTrue(manager.is_processed('recent-event'))
+        self.assertFalse(manager.is_processed('old-event'))
 
 
 if __name__ == '__main__':
@@ -1,10 +1,12 @@
 """Unit tests for VisionClient."""
 
 import unittest
+from io import BytesIO
 from unittest.mock import Mock, patch
 from PIL import Image
 
 from vision_client import (
+    MAX_IMAGE_SIZE,
     VisionClient,
     VisionModelResponse,
     GeminiVisionClient,
@@ -29,6 +31,12 @@ class TestVisionModelResponse(unittest.TestCase):
         self.assertEqual(response.correct_label, 'person')
         self.assertEqual(response.confidence, 0.95)
         self.assertEqual(response.notes, 'Clear image')
+    
+    def test_response_has_no_instance_dict(self):
+        """Test VisionModelResponse instances use slots."""
+        response = VisionModelResponse(object_present=True, correct_label='person', confidence=0.95)
+        
+        self.assertFalse(hasattr(response, '__dict__'))
 
 
 class TestVisionClientBase(unittest.TestCase):
@@ -83,6 +91,24 @@ class TestVisionClientBase(unittest.TestCase):
         
         self.assertIsNone(response)
     
+    def test_parse_wrong_field_type(self):
+        """Test a response that doesn't match the schema returns None."""
+        client = VisionClient()
+        
+        response_text = '{"object_present": "yes", "correct_label": "person", "confidence": 0.9}'
+        
+        self.assertIsNone(client._parse_response(response_text))
+    
+    def test_repeated_label_shared(self):
+        """Test the same label from separate responses is one string object."""
+        client = VisionClient()
+        response_text = '{"object_present": true, "correct_label": "person", "confidence": 0.9}'
+        
+        first = client._parse_response(response_text)
+        second = client._parse_response(response_text)
+        
+        self.assertIs(first.correct_label, second.correct_label)
+    
     def test_confidence_clamping(self):
         """Test that confidence values are clamped to [0, 1]."""
         client = VisionClient()
@@ -96,6 +122,103 @@ class TestVisionClientBase(unittest.TestCase):
         response_text = '{"object_present": true, "correct_label": "test", "confidence": -0.5}'
         response = client._parse_response(response_text)
         self.assertEqual(response.confidence, 0.0)
+    
+    def test_parse_combined_response(self):
+        """Test parsing a combined response keyed by event ID."""
+        client = VisionClient()
+        
+        response_text = '''```json
+        [
+            {"event_id": "event-2", "object_present": false, "correct_label": "", "confidence": 0.9},
+            {"event_id": "event-1", "object_present": true, "correct_label": "car", "confidence": 0.8},
+            {"event_id": "unknown", "object_present": true, "correct_label": "dog", "confidence": 0.7}
+        ]
+        ```'''
+        
+        responses = client._parse_combined_response(response_text, ['event-1', 'event-2', 'event-3'])
+        
+        self.assertEqual(set(responses), {'event-1', 'event-2'})
+        self.assertEqual(responses['event-1'].correct_label, 'car')
+        self.assertFalse(responses['event-2'].object_present)
+    
+    def test_parse_combined_response_not_array(self):
+        """Test a combined response that isn't a JSON array returns None."""
+        client = VisionClient()
+        
+        response_text = '{"object_present": true, "correct_label": "car", "confidence": 0.8}'
+        
+        self.assertIsNone(client._parse_combined_response(response_text, ['event-1']))
+    
+    @patch('vision_client.genai')
+    def test_failed_combined_request_not_retried_per_image(self, mock_genai):
+        """Test a failed combined request returns no results rather than analyzing each image."""
+        client = GeminiVisionClient(api_key='test-key')
+        client.client.models.generate_content.side_effect = RuntimeError('boom')
+        client.analyze_image = Mock()
+        
+        responses = client.analyze_combined([
+            ('event-1', Image.new('RGB', (64, 64)), 'person'),
+            ('event-2', Image.new('RGB', (64, 64)), 'car')
+        ])
+        
+        self.assertEqual(responses, {})
+        client.analyze_image.assert_not_called()
+    
+    @patch('vision_client.genai')
+    def test_gemini_sends_jpeg(self, mock_genai):
+        """Test Gemini requests carry the image as downscaled JPEG bytes."""
+        client = GeminiVisionClient(api_key='test-key')
+        client.client.models.generate_content.return_value = Mock(
+            text='{"object_present": true, "correct_label": "person", "confidence": 0.9}'
+        )
+        
+        client.analyze_image(Image.new('RGB', (1920, 1080)), 'person')
+        
+        image_part = client.client.models.generate_content.call_args.kwargs['contents'][-1]
+        self.assertEqual(image_part.inline_data.mime_type, 'image/jpeg')
+        with Image.open(BytesIO(image_part.inline_data.data)) as image:
+            self.assertEqual(max(image.size), MAX_IMAGE_SIZE)
+    
+    @patch('vision_client.genai')
+    def test_gemini_close_without_sdk_support(self, mock_genai):
+        """Test closing works with google-genai releases that lack Client.close."""
+        client = GeminiVisionClient(api_key='test-key')
+        client.client = Mock(spec=['models'])
+        
+        client.close()
+
+
+class TestImagePreparation(unittest.TestCase):
+    """Test cases for image downscaling before upload."""
+    
+    def _jpeg(self, size):
+        """Encode a blank image of the given size as JPEG bytes."""
+        buffer = BytesIO()
+        Image.new('RGB', size).save(buffer, format='JPEG')
+        return buffer.getvalue()
+    
+    def test_large_image_downscaled(self):
+        """Test a 1080p snapshot is shrunk to fit MAX_IMAGE_SIZE."""
+        encoded = VisionClient._image_to_jpeg(self._jpeg((1920, 1080)))
+        
+        with Image.open(BytesIO(encoded)) as image:
+            self.assertEqual(max(image.size), MAX_IMAGE_SIZE)
+            self.assertEqual(image.format, 'JPEG')
+    
+    def test_small_jpeg_unchanged(self):
+        """Test a JPEG that already fits is sent as-is."""
+        data = self._jpeg((640, 360))
+        
+        self.assertIs(VisionClient._image_to_jpeg(data), data)
+    
+    def test_passed_image_not_modified(self):
+        """Test downscaling doesn't resize the caller's image."""
+        image = Image.new('RGB', (1920, 1080))
+        
+        prepared = VisionClient._prepare_image(image)
+        
+        self.assertEqual(image.size, (1920, 1080))
+        self.assertEqual(prepared.size, (768, 432))
 
 
 class TestCreateVisionClient(unittest.TestCase):